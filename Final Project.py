@@ -1,510 +1,680 @@
 from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
-import math
-
+from OpenGL.GL import shaders
+from OpenGL.arrays import vbo
+from OpenGL import callprofile
+from OpenGL import error as gl_error
+import atexit
+import sys
+import time
+import numpy as np
+from portal_sim import (
+    GameState, Inputs, BULLET_BLUE, BULLET_YELLOW, BULLET_RADIUS, PLAYER_SPEED,
+    look_direction,
+)
+import portal_level
+import portal_log
+import portal_profile
+import portal_replay
+from portal_replay import MOVE, TURN, FIRE, RESET, CLEAR
+
+log = portal_log.get_logger('render')
+
+# Game state, advanced by the timer and drawn by display
+game = GameState()
+# Frame profiling; the overlay is toggled with 'o', --profile PATH also counts GL calls and dumps stats on exit
+profiler = portal_profile.Profiler()
+game.profiler = profiler
+OVERLAY_REFRESH = 0.5  # Seconds between rebuilds of the overlay text
+overlay_visible = False
+overlay_list = None  # Display list holding the rendered overlay text
+overlay_time = 0.0  # perf_counter() when overlay_list was last rebuilt
+UNCHECKED_GL_CALLS = ('glVertex3f', 'glColor3f', 'glColor4f')  # Per-frame immediate-mode calls run without glGetError
+GL_PROFILE_TOP = 15  # Entry points logged by --gl-profile PATH, which needs PYOPENGL_CALL_PROFILING=1
 # Camera/player settings
-player_pos = [10.0, 0.0, 10.0]  # Player position (center of room, ground level)
-player_yaw = 0.0               # Player rotation (left/right)
-player_pitch = 0.0             # Player rotation (up/down)
-cam_speed = 0.5
-yaw_speed = 2.0
-room_size = 20.0
-# Wall tile data
-wall_tiles = []
-# Bullet settings
-bullets = []  # Stores active bullets
-BULLET_SPEED = 7.0
-BULLET_LIFETIME = 5.0
-BULLET_RADIUS = 0.1
-blue_shot_fired = False  # Tracks if any blue bullet hit a tile
-yellow_shot_fired = False  # Tracks if any yellow bullet hit a tile
-# Teleportation cooldown
-last_teleport_time = 0.0
-TELEPORT_COOLDOWN = 1.0  # Seconds
+TURN_SPEED = 90.0  # Degrees per second while an arrow key is held
+MOVE_KEYS = {'w': (1, 0), 's': (-1, 0), 'a': (0, -1), 'd': (0, 1)}  # Key -> (forward, strafe)
+keys_down = set()  # Movement keys ('w', 'a', 's', 'd') and arrow keys currently held
+MOUSE_SENSITIVITY = 0.2  # Degrees per pixel
+MOUSE_EDGE_MARGIN = 50  # The captured pointer is warped back to the center this many pixels from an edge
+mouse_last = None  # (x, y) of the last pointer position seen while captured
+mouse_dx = 0  # Pointer motion in pixels not yet applied by a simulation step
+mouse_dy = 0
+# Fixed-timestep loop settings
+SIM_DT = 0.016  # Simulation step in seconds, independent of frame rate
+MAX_SIM_STEPS = 5  # Most steps run per timer tick; older backlog is dropped
+TELEPORT_SNAP = 1.0  # Player moves longer than this in one step are drawn without blending
+last_tick_time = None  # perf_counter() at the previous timer tick
+sim_accumulator = 0.0  # Real time not yet consumed by simulation steps
+render_alpha = 0.0  # Fraction of a step between the previous and current simulation states
+prev_player_pos = None  # Player position before the latest step
+sim_tick = 0  # Simulation steps run so far; input events are stamped with it
+# Input recording and replay, enabled with --record PATH / --replay PATH
+TIMER_MS = 16  # Timer period while anything is changing
+IDLE_TIMER_MS = 250  # Timer period once nothing has changed for IDLE_AFTER_TICKS ticks
+IDLE_AFTER_TICKS = 30
+FRAME_INTERVAL = 0.016  # Shortest time between redraws requested by input, about one vsync at 60 Hz
+frame_dirty = True  # Something drawn changed since the last frame
+redraw_pending = False  # glutPostRedisplay was called and display() has not run yet
+last_frame_time = 0.0  # perf_counter() at the last display()
+last_scene = None  # scene_key() at the previous timer tick
+idle_ticks = 0  # Consecutive timer ticks without changes
+timer_generation = 0  # Timer callbacks carrying an older value belong to a superseded chain and stop
+recorder = None  # portal_replay.Recorder while recording
+replay_player = None  # portal_replay.Player while replaying; live input is ignored
 # Mouse capture settings
 mouse_captured = False
 window_width = 800
 window_height = 600
-# Physics settings
-v_y = 0.0  # Vertical velocity
-GRAVITY = -20.0  # Gravity acceleration
-is_falling = False  # Tracks if player is falling after teleport
-# Button settings
-BUTTON_POS = [2, 0, 2]  # Button at (2, 0, 2), lower circular face on floor
-BUTTON_RADIUS = 2  # Radius of cylinder
-BUTTON_HEIGHT = 0.833  # Height of cylinder (1/3 player height)
-door_color = 'red'  # Default door color
-button_activated = False  # Tracks if button has been stepped on
-# Win state
-game_won = False  # Tracks if player has cleared the level
-
-class Bullet:
-    def __init__(self, pos, direction, color):
-        self.pos = list(pos)  # [x, y, z]
-        self.velocity = [d * BULLET_SPEED for d in direction]  # Scaled direction
-        self.time_alive = 0.0
-        self.color = color  # 'blue' or 'yellow'
-
-def ray_aabb_intersection(start, end, aabb_min, aabb_max):
-    """Check if a ray from start to end intersects an AABB."""
-    tmin = 0.0
-    tmax = 1.0
-    direction = [end[i] - start[i] for i in range(3)]
-    
-    for i in range(3):
-        if abs(direction[i]) < 1e-6:
-            if start[i] < aabb_min[i] or start[i] > aabb_max[i]:
-                return False
-        else:
-            ood = 1.0 / direction[i]
-            t1 = (aabb_min[i] - start[i]) * ood
-            t2 = (aabb_max[i] - start[i]) * ood
-            tmin = max(tmin, min(t1, t2))
-            tmax = min(tmax, max(t1, t2))
-            if tmin > tmax:
-                return False
-    return tmin <= tmax and tmin <= 1.0
-
-def ray_plane_intersection(start, end, plane_point, plane_normal):
-    """Compute ray (start to end) intersection with a plane (point, normal). Returns t or None."""
-    direction = [end[i] - start[i] for i in range(3)]
-    denom = sum(plane_normal[i] * direction[i] for i in range(3))
-    if abs(denom) < 1e-6:
-        return None  # Ray parallel to plane
-    t = sum(plane_normal[i] * (plane_point[i] - start[i]) for i in range(3)) / denom
-    if t < 0 or t > 1:
-        return None  # Intersection outside segment
-    return t
-
-def update_bullets(dt):
-    global bullets, wall_tiles, blue_shot_fired, yellow_shot_fired, button_activated
-    if game_won:
-        return  # Skip bullet updates if game is won
-    new_bullets = []
-    blue_hit = False
-    yellow_hit = False
-    
-    for bullet in bullets:
-        bullet.time_alive += dt
-        if bullet.time_alive >= BULLET_LIFETIME:
-            continue
-        old_pos = list(bullet.pos)
-        bullet.pos[0] += bullet.velocity[0] * dt
-        bullet.pos[1] += bullet.velocity[1] * dt
-        bullet.pos[2] += bullet.velocity[2] * dt
-        new_pos = bullet.pos
-        if not (0 <= bullet.pos[0] <= room_size and 0 <= bullet.pos[2] <= room_size and
-                0 <= bullet.pos[1] <= 9.0):
-            new_bullets.append(bullet)
-            continue
-        bullet_alive = True
-
-        # Check collision with door laser wall (Z=15, X=0-20, Y=0-9)
-        if not button_activated:
-            t = ray_plane_intersection(old_pos, new_pos, [0.0, 0.0, 15.0], [0.0, 0.0, 1.0])
-            if t is not None:
-                hit_point = [old_pos[i] + t * (new_pos[i] - old_pos[i]) for i in range(3)]
-                if (0.0 <= hit_point[0] <= 20.0 and 0.0 <= hit_point[1] <= 9.0):
-                    bullet_alive = False
-                    print(f"{bullet.color} bullet hit door laser wall at {hit_point}")
-                    continue
-
-        # Check collision with button laser walls (Z=8.5, X=0-9; X=9, Z=0-8.5; Y=0-9)
-        # Z=8.5 plane with hole at X=4-5, Y=2-3
-        t = ray_plane_intersection(old_pos, new_pos, [0.0, 0.0, 8.5], [0.0, 0.0, 1.0])
-        if t is not None:
-            hit_point = [old_pos[i] + t * (new_pos[i] - old_pos[i]) for i in range(3)]
-            if (0.0 <= hit_point[0] <= 9.0 and 0.0 <= hit_point[1] <= 9.0):
-                if not (4.0 <= hit_point[0] <= 5.0 and 2.0 <= hit_point[1] <= 3.0):
-                    bullet_alive = False
-                    print(f"{bullet.color} bullet hit button laser wall at Z=8.5, point={hit_point}")
-                    continue
-        # X=9 plane (no hole)
-        t = ray_plane_intersection(old_pos, new_pos, [9.0, 0.0, 0.0], [1.0, 0.0, 0.0])
-        if t is not None:
-            hit_point = [old_pos[i] + t * (new_pos[i] - old_pos[i]) for i in range(3)]
-            if (0.0 <= hit_point[2] <= 8.5 and 0.0 <= hit_point[1] <= 9.0):
-                bullet_alive = False
-                print(f"{bullet.color} bullet hit button laser wall at X=9, point={hit_point}")
-                continue
-
-        # Check collision with wall tiles
-        for tile in wall_tiles:
-            coords, _ = tile
-            x_min = min(v[0] for v in coords)
-            x_max = max(v[0] for v in coords)
-            y_min = min(v[1] for v in coords)
-            y_max = max(v[1] for v in coords)
-            z_min = min(v[2] for v in coords)
-            z_max = max(v[2] for v in coords)
-            aabb_min = [x_min - BULLET_RADIUS, y_min - BULLET_RADIUS, z_min - BULLET_RADIUS]
-            aabb_max = [x_max + BULLET_RADIUS, y_max + BULLET_RADIUS, z_max + BULLET_RADIUS]
-            if ray_aabb_intersection(old_pos, new_pos, aabb_min, aabb_max):
-                tile[1] = bullet.color
-                bullet_alive = False
-                if bullet.color == 'blue':
-                    blue_hit = True
-                else:
-                    yellow_hit = True
-                print(f"{bullet.color} bullet hit wall tile at {new_pos}")
-                break
-
-        if bullet_alive:
-            new_bullets.append(bullet)
-
-    if blue_hit:
-        blue_shot_fired = True
-        new_bullets = [b for b in new_bullets if b.color != 'blue']
-    if yellow_hit:
-        yellow_shot_fired = True
-        new_bullets = [b for b in new_bullets if b.color != 'yellow']
-    bullets = new_bullets
-
-def update_player_physics(dt):
-    global player_pos, v_y, is_falling
-    if game_won:
-        return  # Skip physics if game is won
-    if is_falling and player_pos[1] > 0.0:
-        v_y += GRAVITY * dt
-        player_pos[1] += v_y * dt
-        print(f"Falling: y={player_pos[1]:.2f}, v_y={v_y:.2f}")
-        if player_pos[1] <= 0.0:
-            player_pos[1] = 0.0
-            v_y = 0.0
-            is_falling = False
-            print("Landed on ground: y=0.0, v_y=0.0")
-
-def check_player_tile_collision():
-    global player_pos, wall_tiles, last_teleport_time, player_yaw, v_y, is_falling
-    if game_won:
-        return  # Skip collision checks if game is won
-    from time import time
-    current_time = time()
-    if current_time - last_teleport_time < TELEPORT_COOLDOWN:
+FIELD_OF_VIEW = 60.0  # Vertical, in degrees
+NEAR_PLANE = 0.1
+FAR_PLANE = 100.0
+EYE_HEIGHT = 2.5  # Camera height above the player position
+view_frustum = None  # (normals, offsets) of the six inward-facing view planes, set by display() each frame
+# Wall mesh buffers, built once in init and recolored in place
+TILE_FILL_COLOR = (0.6, 0.6, 0.6)
+DOOR_COLORS = {'red': (1.0, 0.0, 0.0), 'green': (0.0, 1.0, 0.0)}
+wall_meshes = []  # Per wall: (corners, colors) of its greedy-meshed quads, 4 float32 vertices per quad
+wall_vertex_vbo = None  # Quad corners of every wall mesh, wall after wall
+wall_color_vbo = None  # Quad colors, matching wall_vertex_vbo
+wall_quad_first = None  # First quad of each wall in the wall VBOs
+wall_quad_count = None  # Quads per wall
+wall_tile_first = None  # First tile of each wall; tiles are stored wall after wall, row-major
+wall_quad_bounds = None  # (quads, 2, 3) min and max corners of every wall quad, for culling
+wall_bounds = None  # (walls, 2, 3) min and max corners of every wall
+wall_line_first = None  # First grid line vertex of each wall in wall_outline_vbo
+wall_line_count = None  # Grid line vertices per wall
+wall_outline_vbo = None  # Tile grid lines, one segment per row or column edge of each wall
+# Static meshes, compiled once in init
+gun_list = None  # Display list for the HUD gun
+button_lists = []  # (display list, bounds) per button and per button laser wall
+laser_bounds = None  # (lasers, 2, 3) min and max corners of every laser wall
+# Unit circle vertex buffers, keyed by (segments, fan)
+CIRCLE_MESHES = ((64, False), (32, False), (32, True))  # Crosshair ring, crosshair dot, portal ellipse
+circle_vbos = {}
+# Instanced bullet rendering: one sphere mesh, one (offset, color) record per bullet
+BULLET_SLICES = 12  # Sphere tessellation, shared by the instanced mesh and the GLUT fallback
+BULLET_STACKS = 8
+BULLET_FILL_COLORS = np.array([(0.0, 0.0, 1.0), (1.0, 1.0, 0.0)], dtype=np.float32)  # Indexed by bullet color id
+BULLET_VERTEX_SHADER = """
+#version 120
+attribute vec3 vertex;
+attribute vec3 offset;
+attribute vec3 color;
+varying vec3 fill;
+void main() {
+    fill = color;
+    gl_Position = gl_ModelViewProjectionMatrix * vec4(vertex + offset, 1.0);
+}
+"""
+BULLET_FRAGMENT_SHADER = """
+#version 120
+varying vec3 fill;
+void main() {
+    gl_FragColor = vec4(fill, 1.0);
+}
+"""
+bullet_program = None  # Instancing shader program, or None to draw one glutSolidSphere per bullet
+bullet_sphere_vbo = None  # Sphere triangles centered on the origin
+bullet_instance_vbo = None  # Per-bullet offset and color, refilled every frame
+
+def frustum_planes(eye, direction, aspect):
+    """Return (normals, offsets) of the view frustum set up by reshape() and display().
+
+    A point p is inside plane i when normals[i] . p + offsets[i] >= 0; the
+    normals are unit length, so that value is also the distance to the plane.
+    """
+    forward = np.asarray(direction, dtype=float)
+    forward /= np.linalg.norm(forward)
+    side = np.cross(forward, (0.0, 1.0, 0.0))
+    side /= np.linalg.norm(side)
+    up = np.cross(side, forward)
+    tan_y = np.tan(np.radians(FIELD_OF_VIEW) / 2)
+    tan_x = tan_y * aspect
+    normals = np.array([
+        forward,
+        -forward,
+        forward * tan_x + side,  # Left
+        forward * tan_x - side,  # Right
+        forward * tan_y + up,  # Bottom
+        forward * tan_y - up,  # Top
+    ])
+    normals /= np.linalg.norm(normals, axis=1)[:, None]
+    offsets = -normals @ np.asarray(eye, dtype=float)
+    offsets[0] -= NEAR_PLANE
+    offsets[1] += FAR_PLANE
+    return normals, offsets
+
+def boxes_visible(bounds):
+    """Return a mask of the (n, 2, 3) min/max boxes that reach into the view frustum.
+
+    Each box is tested at its corner furthest along every plane normal, so a
+    box is only rejected when it lies wholly outside one plane.
+    """
+    if view_frustum is None:
+        return np.ones(len(bounds), dtype=bool)
+    normals, offsets = view_frustum
+    corners = np.where(normals[None] > 0, bounds[:, 1:2], bounds[:, 0:1])  # (n, planes, 3)
+    return ((corners * normals[None]).sum(axis=2) + offsets >= 0).all(axis=1)
+
+def spheres_visible(centers, radius):
+    """Return a mask of the spheres at centers (n, 3) that reach into the view frustum."""
+    if view_frustum is None:
+        return np.ones(len(centers), dtype=bool)
+    normals, offsets = view_frustum
+    return (centers @ normals.T + offsets >= -radius).all(axis=1)
+
+def visible_runs(mask):
+    """Return (first, count) for each run of consecutive True entries in mask."""
+    index = np.flatnonzero(mask)
+    if len(index) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(index) != 1)
+    firsts = index[np.concatenate([[0], breaks + 1])]
+    lasts = index[np.concatenate([breaks, [len(index) - 1]])]
+    return list(zip(firsts.tolist(), (lasts - firsts + 1).tolist()))
+
+def tile_fill_colors():
+    """Return the quad color of every tile as a float32 (tiles, 3) array: the door color for door tiles, gray otherwise."""
+    return np.where(game.tile_is_door[:, None], DOOR_COLORS[game.door_color], TILE_FILL_COLOR).astype(np.float32)
+
+def greedy_rects(keys):
+    """Merge a (rows, cols) grid of keys into rectangles of equal keys.
+
+    Runs of equal keys along each row are stacked onto the rectangle above
+    when it spans the same columns with the same key. Returns (row0, row1,
+    col0, col1, key) tuples with half-open row and column ranges.
+    """
+    rows, cols = keys.shape
+    starts = np.ones((rows, cols), dtype=bool)
+    starts[:, 1:] = keys[:, 1:] != keys[:, :-1]
+    rects = []
+    open_rects = {}  # (col0, col1, key) -> index in rects of the rectangle reaching the previous row
+    for row in range(rows):
+        edges = np.flatnonzero(starts[row]).tolist() + [cols]
+        row_keys = keys[row]
+        reaching = {}
+        for col0, col1 in zip(edges[:-1], edges[1:]):
+            run = (col0, col1, row_keys[col0])
+            index = open_rects.get(run)
+            if index is None:
+                index = len(rects)
+                rects.append([row, row + 1, col0, col1, run[2]])
+            else:
+                rects[index][1] = row + 1
+            reaching[run] = index
+        open_rects = reaching
+    return rects
+
+def mesh_wall(wall, fills):
+    """Greedy-mesh one wall: merge its equally colored tiles into quads.
+
+    fills holds the quad color of every tile. Returns float32 (corners,
+    colors) arrays with 4 vertices per quad.
+    """
+    walls = game.level.walls
+    rows = int(walls['rows'][wall])
+    cols = int(walls['cols'][wall])
+    first = int(wall_tile_first[wall])
+    colors, keys = np.unique(fills[first:first + rows * cols], axis=0, return_inverse=True)
+    rects = np.array(greedy_rects(keys.reshape(rows, cols)), dtype=np.int64).reshape(-1, 5)
+    # Corners follow the tile layout of portal_level.wall_tiles, so merged edges land exactly on tile edges
+    x1, z1 = walls['start'][wall]
+    x2, z2 = walls['end'][wall]
+    dx = (x2 - x1) / cols
+    dz = (z2 - z1) / cols
+    dy = walls['height'][wall] / rows
+    row0, row1, col0, col1, key = rects.T
+    left = np.stack([x1 + col0 * dx, z1 + col0 * dz], axis=1)
+    right = np.stack([x1 + col1 * dx, z1 + col1 * dz], axis=1)
+    bottom = row0 * dy
+    top = row1 * dy
+    corners = np.stack([
+        np.stack([left[:, 0], bottom, left[:, 1]], axis=1),
+        np.stack([right[:, 0], bottom, right[:, 1]], axis=1),
+        np.stack([right[:, 0], top, right[:, 1]], axis=1),
+        np.stack([left[:, 0], top, left[:, 1]], axis=1),
+    ], axis=1).astype(np.float32)
+    return corners.reshape(-1, 3), np.repeat(colors[key], 4, axis=0)
+
+def wall_grid_lines(wall):
+    """Return the tile grid of one wall as GL_LINES vertices: full-width row edges, full-height column edges."""
+    walls = game.level.walls
+    rows = int(walls['rows'][wall])
+    cols = int(walls['cols'][wall])
+    x1, z1 = walls['start'][wall]
+    x2, z2 = walls['end'][wall]
+    dx = (x2 - x1) / cols
+    dz = (z2 - z1) / cols
+    dy = walls['height'][wall] / rows
+    y = np.arange(rows + 1) * dy
+    c = np.arange(cols + 1)
+    horizontal = np.stack([
+        np.stack([np.full(rows + 1, x1), y, np.full(rows + 1, z1)], axis=1),
+        np.stack([np.full(rows + 1, x1 + cols * dx), y, np.full(rows + 1, z1 + cols * dz)], axis=1),
+    ], axis=1)
+    vertical = np.stack([
+        np.stack([x1 + c * dx, np.zeros(cols + 1), z1 + c * dz], axis=1),
+        np.stack([x1 + c * dx, np.full(cols + 1, rows * dy), z1 + c * dz], axis=1),
+    ], axis=1)
+    return np.concatenate([horizontal, vertical]).reshape(-1, 3).astype(np.float32)
+
+def upload_wall_meshes():
+    """Copy the per-wall meshes into the wall VBOs, wall after wall."""
+    global wall_quad_first, wall_quad_count, wall_quad_bounds
+    wall_quad_count = np.array([len(corners) // 4 for corners, _ in wall_meshes], dtype=np.int64)
+    wall_quad_first = np.cumsum(wall_quad_count) - wall_quad_count
+    corners = np.concatenate([corners for corners, _ in wall_meshes] + [np.zeros((0, 3), np.float32)])
+    quads = corners.reshape(-1, 4, 3)
+    wall_quad_bounds = np.stack([quads.min(axis=1), quads.max(axis=1)], axis=1)
+    wall_vertex_vbo.set_array(corners)
+    wall_color_vbo.set_array(np.concatenate([colors for _, colors in wall_meshes] + [np.zeros((0, 3), np.float32)]))
+
+def build_wall_mesh():
+    """Build the wall VBOs: greedy-meshed quads per wall plus one batch of grid lines."""
+    global wall_vertex_vbo, wall_color_vbo, wall_outline_vbo, wall_tile_first, wall_bounds
+    global wall_line_first, wall_line_count
+    walls = game.level.walls
+    counts = walls['rows'].astype(np.int64) * walls['cols']
+    wall_tile_first = np.cumsum(counts) - counts
+    wall_bounds = np.zeros((len(walls), 2, 3))
+    if len(walls):
+        wall_bounds[:, 0] = np.minimum.reduceat(game.tile_bounds[:, 0], wall_tile_first)
+        wall_bounds[:, 1] = np.maximum.reduceat(game.tile_bounds[:, 1], wall_tile_first)
+    fills = tile_fill_colors()
+    wall_meshes[:] = [mesh_wall(wall, fills) for wall in range(len(walls))]
+    wall_vertex_vbo = vbo.VBO(np.zeros((0, 3), np.float32), usage='GL_DYNAMIC_DRAW')
+    wall_color_vbo = vbo.VBO(np.zeros((0, 3), np.float32), usage='GL_DYNAMIC_DRAW')
+    upload_wall_meshes()
+    lines = [wall_grid_lines(wall) for wall in range(len(walls))]
+    wall_line_count = np.array([len(segments) for segments in lines], dtype=np.int64)
+    wall_line_first = np.cumsum(wall_line_count) - wall_line_count
+    wall_outline_vbo = vbo.VBO(np.concatenate(lines + [np.zeros((0, 3), np.float32)]), usage='GL_STATIC_DRAW')
+    game.changed_tiles.clear()
+    log.info("Wall mesh: %d tiles in %d quads", len(game.tile_colors), int(wall_quad_count.sum()))
+
+def unit_circle(segments, fan=False):
+    """Return unit circle vertices in the XY plane as a float32 (n, 3) array.
+
+    A fan starts at the center and repeats the first rim point to close the
+    circle; otherwise the array holds just the rim, for line loops and polygons.
+    """
+    count = segments + 1 if fan else segments
+    angles = 2.0 * np.pi * np.arange(count) / segments
+    rim = np.stack([np.cos(angles), np.sin(angles), np.zeros(count)], axis=1)
+    if fan:
+        rim = np.vstack([np.zeros((1, 3)), rim])
+    return rim.astype(np.float32)
+
+def build_circle_meshes():
+    """Upload the unit circles listed in CIRCLE_MESHES as static VBOs."""
+    for segments, fan in CIRCLE_MESHES:
+        circle_vbos[segments, fan] = vbo.VBO(unit_circle(segments, fan), usage='GL_STATIC_DRAW')
+
+def draw_circle(mode, segments, fan=False):
+    """Draw a cached unit circle with mode; position and size it with the modelview matrix."""
+    circle = circle_vbos[segments, fan]
+    glEnableClientState(GL_VERTEX_ARRAY)
+    circle.bind()
+    glVertexPointer(3, GL_FLOAT, 0, circle)
+    glDrawArrays(mode, 0, len(circle.data))
+    circle.unbind()
+    glDisableClientState(GL_VERTEX_ARRAY)
+
+def sync_wall_mesh():
+    """Re-mesh the walls holding tiles the simulation recolored since the last frame."""
+    changed = game.changed_tiles
+    if not changed:
         return
-    teleported = False
-    for tile in wall_tiles:
-        coords, color = tile
-        if color not in ['blue', 'yellow'] or teleported:
-            continue
-        x_min = min(v[0] for v in coords)
-        x_max = max(v[0] for v in coords)
-        y_min = min(v[1] for v in coords)
-        y_max = max(v[1] for v in coords)
-        z_min = min(v[2] for v in coords)
-        z_max = max(v[2] for v in coords)
-        if (x_min - 0.5 <= player_pos[0] <= x_max + 0.5 and
-            y_min - 0.5 <= player_pos[1] <= y_max + 0.5 and
-            z_min - 0.5 <= player_pos[2] <= z_max + 0.5):
-            print(f"Player at {player_pos} touched {color} tile, searching for {'yellow' if color == 'blue' else 'blue'}")
-            dest_color = 'yellow' if color == 'blue' else 'blue'
-            for dest_tile in wall_tiles:
-                dest_coords, dest_tile_color = dest_tile
-                if dest_tile_color == dest_color:
-                    dest_x = (min(v[0] for v in dest_coords) + max(v[0] for v in dest_coords)) / 2
-                    dest_y = min(v[1] for v in dest_coords)
-                    dest_z = (min(v[2] for v in dest_coords) + max(v[2] for v in dest_coords)) / 2
-                    print(f"Dest tile: y_min={y_min:.2f}, y_max={y_max:.2f}, dest_y={dest_y:.2f}")
-                    if abs(dest_x) < 0.1:
-                        dest_x += 2.0
-                        player_yaw = 90
-                    elif abs(dest_x - room_size) < 0.1:
-                        dest_x -= 2.0
-                        player_yaw = -90
-                    if abs(dest_z) < 0.1:
-                        dest_z += 2.0
-                        player_yaw = 180
-                    elif abs(dest_z - room_size) < 0.1:
-                        dest_z -= 2.0
-                        player_yaw = 0
-                    player_pos[0] = dest_x
-                    player_pos[1] = dest_y
-                    player_pos[2] = dest_z
-                    v_y = 0.0
-                    is_falling = True
-                    boundary_player_position()
-                    last_teleport_time = current_time
-                    teleported = True
-                    print(f"Teleported to {dest_color} tile at {player_pos} (y={dest_y:.2f}), cooldown started")
-                    break
-            break
-
-def reset_game():
-    """Reset the game to initial state."""
-    global player_pos, player_yaw, player_pitch, bullets, blue_shot_fired, yellow_shot_fired
-    global door_color, button_activated, v_y, is_falling, last_teleport_time, wall_tiles, game_won
-    player_pos = [10.0, 0.0, 10.0]
-    player_yaw = 0.0
-    player_pitch = 0.0
-    bullets = []
-    blue_shot_fired = False
-    yellow_shot_fired = False
-    for tile in wall_tiles:
-        tile[1] = 'gray'
-    door_color = 'red'
-    button_activated = False
-    v_y = 0.0
-    is_falling = False
-    last_teleport_time = 0.0
-    game_won = False
-    print("Game reset: Player at [10.0, 0.0, 10.0], tiles gray, door red, button off, game_won=False")
-
-def reset_bullets():
-    """Reset bullet allowances and clear portals."""
-    global bullets, blue_shot_fired, yellow_shot_fired, wall_tiles
-    bullets = []
-    blue_shot_fired = False
-    yellow_shot_fired = False
-    for tile in wall_tiles:
-        tile[1] = 'gray'
-    print("Bullets and portals reset: blue_shot_fired=False, yellow_shot_fired=False, tiles gray")
-
-def check_button_laser_collision():
-    """Check if player is too close to button laser walls, reset game if so."""
-    global player_pos
-    if game_won:
-        return  # Skip collision checks if game is won
-    if not (0.0 - 0.5 <= player_pos[1] <= 9.0 + 0.5):
+    fills = tile_fill_colors()
+    walls = np.unique(game.tile_wall[np.fromiter(changed, dtype=np.int64, count=len(changed))])
+    for wall in walls.tolist():
+        wall_meshes[wall] = mesh_wall(wall, fills)
+    upload_wall_meshes()
+    changed.clear()
+    log.debug("Re-meshed %d walls, %d wall quads", len(walls), int(wall_quad_count.sum()))
+
+def sphere_mesh(radius, slices, stacks):
+    """Return a UV sphere as a float32 (slices * stacks * 6, 3) GL_TRIANGLES vertex array."""
+    theta = np.linspace(0.0, np.pi, stacks + 1)
+    phi = np.linspace(0.0, 2.0 * np.pi, slices + 1)
+    ring = radius * np.sin(theta)
+    grid = np.stack([np.outer(ring, np.cos(phi)), np.repeat(radius * np.cos(theta)[:, None], slices + 1, axis=1),
+                     np.outer(ring, np.sin(phi))], axis=-1)
+    a = grid[:-1, :-1]
+    b = grid[1:, :-1]
+    c = grid[1:, 1:]
+    d = grid[:-1, 1:]
+    return np.stack([a, b, c, a, c, d], axis=2).reshape(-1, 3).astype(np.float32)
+
+def build_bullet_mesh():
+    """Upload the bullet sphere and compile the instancing shader, falling back to GLUT spheres."""
+    global bullet_program, bullet_sphere_vbo, bullet_instance_vbo
+    if not (bool(glDrawArraysInstanced) and bool(glVertexAttribDivisor)):
+        log.warning("Instanced drawing unavailable, bullets fall back to glutSolidSphere")
         return
-    if (0.0 <= player_pos[0] <= 9.0 and 8.0 <= player_pos[2] <= 9.0):
-        print(f"Player at {player_pos} touched button laser wall at Z=8.5, resetting game")
-        reset_game()
+    try:
+        program = glCreateProgram()
+        glAttachShader(program, shaders.compileShader(BULLET_VERTEX_SHADER, GL_VERTEX_SHADER))
+        glAttachShader(program, shaders.compileShader(BULLET_FRAGMENT_SHADER, GL_FRAGMENT_SHADER))
+        for location, name in enumerate(('vertex', 'offset', 'color')):
+            glBindAttribLocation(program, location, name)
+        glLinkProgram(program)
+        if not glGetProgramiv(program, GL_LINK_STATUS):
+            raise RuntimeError(glGetProgramInfoLog(program))
+    except (RuntimeError, GLError) as err:
+        log.warning("Bullet shader unavailable (%s), bullets fall back to glutSolidSphere", err)
         return
-    if (8.5 <= player_pos[0] <= 9.5 and 0.0 <= player_pos[2] <= 8.5):
-        print(f"Player at {player_pos} touched button laser wall at X=9, resetting game")
-        reset_game()
+    bullet_program = program
+    bullet_sphere_vbo = vbo.VBO(sphere_mesh(BULLET_RADIUS, BULLET_SLICES, BULLET_STACKS), usage='GL_STATIC_DRAW')
+    bullet_instance_vbo = vbo.VBO(np.zeros((1, 6), dtype=np.float32), usage='GL_STREAM_DRAW')
+
+def draw_bullets(positions, colors):
+    """Draw every bullet in one instanced call from its (n, 3) positions and color ids."""
+    n = len(positions)
+    if n == 0:
         return
-
-def check_door_collision():
-    """Check if player touches door laser wall or green door tiles, handle reset or win."""
-    global player_pos, button_activated, game_won
-    if game_won:
-        return  # Skip collision checks if game is won
-    # Check invisible laser wall at Z=15
-    if (0.0 - 0.5 <= player_pos[0] <= 20.0 + 0.5 and
-        0.0 - 0.5 <= player_pos[1] <= 9.0 + 0.5 and
-        14.5 <= player_pos[2] <= 15.5):
-        if not button_activated:
-            print(f"Player at {player_pos} touched door laser wall at X=0-20, Y=0-9, Z=14.5-15.5, resetting game")
-            reset_game()
-        else:
-            print(f"Player at {player_pos} passed through Z=14.5-15.5 (green door active), no action")
-    # Check green door tiles at Z=20, X=6.67-13.33, Y=0-6
-    elif (6.67 - 0.5 <= player_pos[0] <= 13.33 + 0.5 and
-          0.0 - 0.5 <= player_pos[1] <= 6.0 + 0.5 and
-          19.9 <= player_pos[2] <= 20.1):
-        if button_activated:
-            game_won = True
-            print(f"Player cleared level at {player_pos}: Touched green door tiles, game_won=True")
-        else:
-            print(f"Player at {player_pos} touched door tiles at X=6.67-13.33, Y=0-6, Z=19.9-20.1, but door is red")
-    else:
-        print(f"Player at {player_pos}, not at laser wall (Z=14.5-15.5) or door tiles (Z=19.9-20.1), button_activated={button_activated}, game_won={game_won}")
-
-def draw_bullet(bullet):
+    if bullet_program is None:
+        for i in range(n):
+            draw_bullet(positions[i], colors[i])
+        return
+    instances = np.empty((n, 6), dtype=np.float32)
+    instances[:, :3] = positions
+    instances[:, 3:] = BULLET_FILL_COLORS[colors]
+    bullet_instance_vbo.set_array(instances)
+    glUseProgram(bullet_program)
+    glEnableVertexAttribArray(0)
+    glEnableVertexAttribArray(1)
+    glEnableVertexAttribArray(2)
+    bullet_sphere_vbo.bind()
+    glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, bullet_sphere_vbo)
+    bullet_instance_vbo.bind()
+    glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, 24, bullet_instance_vbo)
+    glVertexAttribPointer(2, 3, GL_FLOAT, GL_FALSE, 24, bullet_instance_vbo + 12)
+    glVertexAttribDivisor(1, 1)
+    glVertexAttribDivisor(2, 1)
+    glDrawArraysInstanced(GL_TRIANGLES, 0, len(bullet_sphere_vbo.data), n)
+    glVertexAttribDivisor(1, 0)
+    glVertexAttribDivisor(2, 0)
+    bullet_instance_vbo.unbind()
+    glDisableVertexAttribArray(0)
+    glDisableVertexAttribArray(1)
+    glDisableVertexAttribArray(2)
+    glUseProgram(0)
+
+def draw_bullet(pos, color):
     glPushMatrix()
-    glTranslatef(bullet.pos[0], bullet.pos[1], bullet.pos[2])
-    if bullet.color == 'blue':
+    glTranslatef(pos[0], pos[1], pos[2])
+    if color == BULLET_BLUE:
         glColor3f(0.0, 0.0, 1.0)
     else:
         glColor3f(1.0, 1.0, 0.0)
-    glutSolidSphere(BULLET_RADIUS, 16, 16)
+    glutSolidSphere(BULLET_RADIUS, BULLET_SLICES, BULLET_STACKS)
     glPopMatrix()
 
+def send_input(kind, a=0.0, b=0.0):
+    """Apply a live input event to the game, logging it when recording; ignored during replay."""
+    if replay_player is not None:
+        return
+    if recorder is not None:
+        recorder.record(sim_tick, kind, a, b)
+    portal_replay.apply_event(game, kind, a, b)
+
+def scene_key():
+    """Return what display() draws from the game apart from bullets and tiles, to spot changes between ticks."""
+    return (tuple(prev_player_pos or ()), tuple(game.player_pos), game.player_yaw, game.player_pitch,
+            game.bullets.count, game.game_won, game.door_color)
+
+def wake_timer():
+    """Restart an idle timer at the active rate.
+
+    The simulation restarts with no leftover time, so the gap since the last
+    idle tick is not stepped with keys that were pressed only now.
+    """
+    global idle_ticks, timer_generation, last_tick_time, sim_accumulator
+    if idle_ticks >= IDLE_AFTER_TICKS:
+        last_tick_time = time.perf_counter()
+        sim_accumulator = 0.0
+        timer_generation += 1
+        glutTimerFunc(0, timer, timer_generation)
+    idle_ticks = 0
+
+def request_redraw():
+    """Mark the frame dirty after input or a window change.
+
+    The redraw is posted at once unless one is already pending or the last
+    frame is less than FRAME_INTERVAL old; the timer picks up the rest.
+    """
+    global frame_dirty, redraw_pending
+    frame_dirty = True
+    wake_timer()
+    if not redraw_pending and time.perf_counter() - last_frame_time >= FRAME_INTERVAL:
+        redraw_pending = True
+        glutPostRedisplay()
+
 def mouse(button, state, x, y):
-    global bullets, blue_shot_fired, yellow_shot_fired, mouse_captured
-    if game_won:
+    global mouse_captured
+    if game.game_won:
         return  # Ignore mouse input if game is won
     if state == GLUT_DOWN:
         if button == GLUT_LEFT_BUTTON:
             if not mouse_captured:
                 mouse_captured = True
                 glutSetCursor(GLUT_CURSOR_NONE)
-                glutWarpPointer(window_width // 2, window_height // 2)
-            if not blue_shot_fired:
-                lx = math.sin(math.radians(player_yaw)) * math.cos(math.radians(player_pitch))
-                ly = math.sin(math.radians(player_pitch))
-                lz = -math.cos(math.radians(player_yaw)) * math.cos(math.radians(player_pitch))
-                direction = [lx, ly, lz]
-                bullet_pos = [
-                    player_pos[0] + lx * 0.8,
-                    player_pos[1] + 2.5 + ly * 0.8,
-                    player_pos[2] + lz * 0.8
-                ]
-                bullets.append(Bullet(bullet_pos, direction, 'blue'))
-                print(f"Shot blue bullet at {bullet_pos}")
+                center_pointer()
+            send_input(FIRE, BULLET_BLUE)
         elif button == GLUT_RIGHT_BUTTON and mouse_captured:
-            if not yellow_shot_fired:
-                lx = math.sin(math.radians(player_yaw)) * math.cos(math.radians(player_pitch))
-                ly = math.sin(math.radians(player_pitch))
-                lz = -math.cos(math.radians(player_yaw)) * math.cos(math.radians(player_pitch))
-                direction = [lx, ly, lz]
-                bullet_pos = [
-                    player_pos[0] + lx * 0.8,
-                    player_pos[1] + 2.5 + ly * 0.8,
-                    player_pos[2] + lz * 0.8
-                ]
-                bullets.append(Bullet(bullet_pos, direction, 'yellow'))
-                print(f"Shot yellow bullet at {bullet_pos}")
-    glutPostRedisplay()
+            send_input(FIRE, BULLET_YELLOW)
+    request_redraw()
 
 def keyboard(key, x, y):
-    global player_pos, player_yaw, player_pitch, bullets, wall_tiles, blue_shot_fired, yellow_shot_fired, mouse_captured
-    if game_won:
+    global mouse_captured, overlay_visible
+    if game.game_won:
         return  # Ignore keyboard input if game is won
     key = key.decode("utf-8").lower()
     if key == '\x1b':
         mouse_captured = False
         glutSetCursor(GLUT_CURSOR_INHERIT)
-    else:
-        lx = math.sin(math.radians(player_yaw))
-        lz = -math.cos(math.radians(player_yaw))
-        if key == 'w':
-            player_pos[0] += lx * cam_speed
-            player_pos[2] += lz * cam_speed
-        elif key == 's':
-            player_pos[0] -= lx * cam_speed
-            player_pos[2] -= lz * cam_speed
-        elif key == 'a':
-            player_pos[0] += lz * cam_speed
-            player_pos[2] -= lx * cam_speed
-        elif key == 'd':
-            player_pos[0] -= lz * cam_speed
-            player_pos[2] += lx * cam_speed
-        elif key == 'r':
-            reset_game()
-        elif key == 'p':
-            reset_bullets()
-    boundary_player_position()
-    glutPostRedisplay()
+    elif key in MOVE_KEYS:
+        keys_down.add(key)  # Moved by the simulation step while held
+    elif key == 'r':
+        send_input(RESET)
+    elif key == 'p':
+        send_input(CLEAR)
+    elif key == 'l':
+        portal_log.flush()
+    elif key == 'o':
+        overlay_visible = not overlay_visible
+        request_redraw()
+    wake_timer()
+
+def keyboard_up(key, x, y):
+    keys_down.discard(key.decode("utf-8").lower())
+
+def held_inputs():
+    """Return Inputs for the held keys and the mouse motion since the last step, or None when there are none."""
+    global mouse_dx, mouse_dy
+    forward = sum(MOVE_KEYS[key][0] for key in keys_down if key in MOVE_KEYS)
+    strafe = sum(MOVE_KEYS[key][1] for key in keys_down if key in MOVE_KEYS)
+    turn = (GLUT_KEY_RIGHT in keys_down) - (GLUT_KEY_LEFT in keys_down)
+    yaw = turn * TURN_SPEED * SIM_DT + mouse_dx * MOUSE_SENSITIVITY
+    pitch = -mouse_dy * MOUSE_SENSITIVITY
+    mouse_dx = mouse_dy = 0
+    if not (forward or strafe or yaw or pitch):
+        return None
+    if forward and strafe:
+        forward *= 0.5 ** 0.5  # Diagonals move no faster than straight lines
+        strafe *= 0.5 ** 0.5
+    return Inputs(forward=forward, strafe=strafe, yaw=yaw, pitch=pitch)
+
+def step_live():
+    """Advance the game one step with the held keys and mouse motion, recording them as TURN and MOVE events."""
+    inputs = held_inputs()
+    if inputs is not None and recorder is not None and not game.game_won:
+        if inputs.yaw or inputs.pitch:
+            recorder.record(sim_tick, TURN, inputs.yaw, inputs.pitch)
+        if inputs.forward or inputs.strafe:
+            recorder.record(sim_tick, MOVE, inputs.forward * PLAYER_SPEED * SIM_DT, inputs.strafe * PLAYER_SPEED * SIM_DT)
+    game.step(SIM_DT, inputs)
 
 def timer(value):
-    update_bullets(0.016)
-    update_player_physics(0.016)
-    glutPostRedisplay()
-    glutTimerFunc(16, timer, 0)
-
-def create_wall_with_tiles(start, end, height=9.0, rows=3, cols=12):
-    x1, z1 = start
-    x2, z2 = end
-    length = math.sqrt((x2 - x1)**2 + (z2 - z1)**2)
-    dx = (x2 - x1) / cols
-    dz = (z2 - z1) / cols
-    dy = height / rows
-    for row in range(rows):
-        for col in range(cols):
-            y_bottom = row * dy
-            y_top = (row + 1) * dy
-            x_left = x1 + col * dx
-            z_left = z1 + col * dz
-            x_right = x1 + (col + 1) * dx
-            z_right = z1 + (col + 1) * dz
-            tile_coords = [
-                (x_left, y_bottom, z_left),
-                (x_right, y_bottom, z_right),
-                (x_right, y_top, z_right),
-                (x_left, y_top, z_left)
-            ]
-            wall_tiles.append([tile_coords, 'gray'])
-            print(f"Wall tile: x=({x_left:.2f}, {x_right:.2f}), z=({z_left:.2f}, {z_right:.2f}), y=({y_bottom:.2f}, {y_top:.2f})")
-
-def create_short_wall_with_tiles_with_door(start, end, height=9.0, rows=3, cols=12):
-    x1, z1 = start
-    x2, z2 = end
-    length = math.sqrt((x2 - x1)**2 + (z2 - z1)**2)
-    dx = (x2 - x1) / cols
-    dz = (z2 - z1) / cols
-    dy = height / rows
-    for row in range(rows):
-        for col in range(cols):
-            y_bottom = row * dy
-            y_top = (row + 1) * dy
-            x_left = x1 + col * dx
-            z_left = z1 + col * dz
-            x_right = x1 + (col + 1) * dx
-            z_right = z1 + (col + 1) * dz
-            tile_coords = [
-                (x_left, y_bottom, z_left),
-                (x_right, y_bottom, z_right),
-                (x_right, y_top, z_right),
-                (x_left, y_top, z_left)
-            ]
-            wall_tiles.append([tile_coords, 'gray'])
-            print(f"Front wall tile: x=({x_left:.2f}, {x_right:.2f}), z=({z_left:.2f}, {z_right:.2f}), y=({y_bottom:.2f}, {y_top:.2f})")
-
-def draw_tile(tile):
-    coords, color = tile
+    """Run fixed SIM_DT simulation steps for the real time elapsed, then redraw if anything changed."""
+    global last_tick_time, sim_accumulator, render_alpha, prev_player_pos, sim_tick
+    global frame_dirty, redraw_pending, last_scene, idle_ticks
+    if value != timer_generation:
+        return
+    now = time.perf_counter()
+    if last_tick_time is not None:
+        sim_accumulator += now - last_tick_time
+    last_tick_time = now
+    steps = 0
+    with profiler.phase('simulation'):
+        while sim_accumulator >= SIM_DT and steps < MAX_SIM_STEPS:
+            prev_player_pos = list(game.player_pos)
+            if replay_player is not None and not replay_player.done:
+                replay_player.step()
+                if replay_player.done:
+                    log.info("Replay finished at tick %d, matches recording: %s", replay_player.tick, replay_player.matches())
+            else:
+                step_live()
+            sim_tick += 1
+            sim_accumulator -= SIM_DT
+            steps += 1
+    if sim_accumulator >= SIM_DT:
+        # Too far behind: drop the backlog instead of compounding slow frames
+        sim_accumulator %= SIM_DT
+    render_alpha = sim_accumulator / SIM_DT
+    scene = scene_key()
+    # Bullets move every tick; recolored tiles wait for the renderer to re-mesh them
+    if scene != last_scene or game.bullets.count or game.changed_tiles:
+        frame_dirty = True
+    last_scene = scene
+    idle_ticks = 0 if frame_dirty else idle_ticks + 1
+    if frame_dirty and not redraw_pending:
+        redraw_pending = True
+        glutPostRedisplay()
+    replaying = replay_player is not None and not replay_player.done
+    idle = idle_ticks >= IDLE_AFTER_TICKS and not replaying and not keys_down
+    glutTimerFunc(IDLE_TIMER_MS if idle else TIMER_MS, timer, timer_generation)
+
+def render_player_pos():
+    """Return the player position blended between the last two simulation steps by render_alpha."""
+    current = game.player_pos
+    prev = prev_player_pos
+    if prev is None or max(abs(current[i] - prev[i]) for i in range(3)) > TELEPORT_SNAP:
+        return current
+    return [prev[i] + (current[i] - prev[i]) * render_alpha for i in range(3)]
+
+def draw_walls():
+    """Draw the wall meshes and their grid lines, then the portals on top."""
+    sync_wall_mesh()
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_COLOR_ARRAY)
     glEnable(GL_POLYGON_OFFSET_FILL)
     glPolygonOffset(2.0, 2.0)
-    glColor3f(0.6, 0.6, 0.6)
-    glBegin(GL_QUADS)
-    for vertex in coords:
-        glVertex3fv(vertex)
-    glEnd()
+    wall_vertex_vbo.bind()
+    glVertexPointer(3, GL_FLOAT, 0, wall_vertex_vbo)
+    wall_color_vbo.bind()
+    glColorPointer(3, GL_FLOAT, 0, wall_color_vbo)
+    # Greedy quads are the culling chunks; visible neighbors are drawn in one call
+    for first, count in visible_runs(boxes_visible(wall_quad_bounds)):
+        glDrawArrays(GL_QUADS, 4 * first, 4 * count)
+    glDisableClientState(GL_COLOR_ARRAY)
     glDisable(GL_POLYGON_OFFSET_FILL)
     glColor3f(0.0, 0.0, 0.0)
-    glBegin(GL_LINE_LOOP)
-    for vertex in coords:
-        glVertex3fv(vertex)
-    glEnd()
-
-    if color in ['blue', 'yellow']:
-        x_min = min(v[0] for v in coords)
-        x_max = max(v[0] for v in coords)
-        y_min = min(v[1] for v in coords)
-        y_max = max(v[1] for v in coords)
-        z_min = min(v[2] for v in coords)
-        z_max = max(v[2] for v in coords)
-        center = [(x_min + x_max) / 2, (y_min + y_max) / 2, (z_min + z_max) / 2]
-        normal = [0.0, 0.0, 0.0]
-        if abs(z_max - z_min) < 0.1:
-            normal[2] = 1.0 if z_min < 10.0 else -1.0
-        elif abs(x_max - x_min) < 0.1:
-            normal[0] = 1.0 if x_min < 10.0 else -1.0
-        glColor3f(0.0, 0.0, 1.0) if color == 'blue' else glColor3f(1.0, 1.0, 0.0)
-        glPushMatrix()
-        glTranslatef(center[0] + normal[0] * 0.01, center[1] + normal[1] * 0.01, center[2] + normal[2] * 0.01)
-        if normal[0] != 0.0:
-            glRotatef(90.0, 0.0, 1.0, 0.0)
-        glScalef(0.67, 1.2, 1.0)
-        segments = 32
-        glBegin(GL_TRIANGLE_FAN)
-        glVertex3f(0.0, 0.0, 0.0)
-        for i in range(segments + 1):
-            theta = 2.0 * math.pi * i / segments
-            glVertex3f(math.cos(theta), math.sin(theta), 0.0)
-        glEnd()
-        glPopMatrix()
-        print(f"Drawing {color} portal at center={center}, normal={normal}")
+    wall_outline_vbo.bind()
+    glVertexPointer(3, GL_FLOAT, 0, wall_outline_vbo)
+    for first, count in visible_runs(boxes_visible(wall_bounds)):
+        glDrawArrays(GL_LINES, int(wall_line_first[first]), int(wall_line_count[first:first + count].sum()))
+    wall_outline_vbo.unbind()
+    glDisableClientState(GL_VERTEX_ARRAY)
+    for tiles in game.portals.values():
+        for portal in tiles.values():
+            if (not game.tile_is_door[portal['tile']] and
+                    boxes_visible(game.tile_bounds[portal['tile']][None] + PORTAL_MARGIN)[0]):
+                draw_portal(portal)
+
+PORTAL_MARGIN = np.array([[-0.01], [0.01]])  # Portals are drawn 0.01 off the wall
+
+def draw_portal(portal):
+    """Draw a portal ellipse on its tile, nudged off the wall along the wall normal."""
+    color = game.tile_colors[portal['tile']]
+    center = [(portal['min'][i] + portal['max'][i]) / 2 for i in range(3)]
+    normal = portal['normal']
+    glColor3f(0.0, 0.0, 1.0) if color == 'blue' else glColor3f(1.0, 1.0, 0.0)
+    glPushMatrix()
+    glTranslatef(center[0] + normal[0] * 0.01, center[1] + normal[1] * 0.01, center[2] + normal[2] * 0.01)
+    if normal[0] != 0.0:
+        glRotatef(90.0, 0.0, 1.0, 0.0)
+    glScalef(0.67, 1.2, 1.0)
+    draw_circle(GL_TRIANGLE_FAN, 32, fan=True)
+    glPopMatrix()
+    log.debug("Drawing %s portal at center=%s, normal=%s", color, center, normal)
 
 def draw_floor_and_ceiling():
+    (x0, y0, z0), (x1, y1, z1) = game.room_min, game.room_max
     glColor3f(0.3, 0.3, 0.3)
     glBegin(GL_QUADS)
-    glVertex3f(0, 0, 0)
-    glVertex3f(20, 0, 0)
-    glVertex3f(20, 0, 20)
-    glVertex3f(0, 0, 20)
+    glVertex3f(x0, y0, z0)
+    glVertex3f(x1, y0, z0)
+    glVertex3f(x1, y0, z1)
+    glVertex3f(x0, y0, z1)
     glEnd()
     glColor3f(0.75, 0.75, 0.75)
     glBegin(GL_QUADS)
-    glVertex3f(0, 9.0, 0)
-    glVertex3f(20, 9.0, 0)
-    glVertex3f(20, 9.0, 20)
-    glVertex3f(0, 9.0, 20)
+    glVertex3f(x0, y1, z0)
+    glVertex3f(x1, y1, z0)
+    glVertex3f(x1, y1, z1)
+    glVertex3f(x0, y1, z1)
     glEnd()
 
+def build_static_meshes():
+    """Compile the gun, each button and each button laser wall into display lists, with one shared quadric."""
+    global gun_list, laser_bounds
+    laser_bounds = np.zeros((len(game.lasers), 2, 3))
+    for index, laser in enumerate(game.lasers):
+        laser_bounds[index] = laser['min'], laser['max']
+        laser_bounds[index, :, laser['axis']] = laser['value']
+    quad = gluNewQuadric()
+    gun_list = glGenLists(1)
+    glNewList(gun_list, GL_COMPILE)
+    draw_gun_geometry(quad)
+    glEndList()
+    button_lists[:] = []
+    for button in game.buttons:
+        pos = button['pos']
+        bounds = np.array([[pos[0] - button['radius'], pos[1], pos[2] - button['radius']],
+                           [pos[0] + button['radius'], pos[1] + button['height'], pos[2] + button['radius']]])
+        button_lists.append((compile_list(draw_button_geometry, quad, button), bounds))
+    for index, laser in enumerate(game.lasers):
+        if not laser['guarded']:
+            button_lists.append((compile_list(draw_button_laser_geometry, laser), laser_bounds[index]))
+    gluDeleteQuadric(quad)
+
+def compile_list(draw, *args):
+    """Compile draw(*args) into a new display list and return it."""
+    display_list = glGenLists(1)
+    glNewList(display_list, GL_COMPILE)
+    draw(*args)
+    glEndList()
+    return display_list
+
 def draw_gun_fps():
+    glCallList(gun_list)
+
+def draw_gun_geometry(quad):
+    """Issue the HUD gun: receiver and barrel cylinders and a tilted grip."""
     glPushMatrix()
     glTranslatef(0.2, -0.3, -0.8)
     glPushMatrix()
     glColor3f(0.15, 0.15, 0.15)
-    gluCylinder(gluNewQuadric(), 0.07, 0.07, 0.2, 32, 8)
+    gluCylinder(quad, 0.07, 0.07, 0.2, 32, 8)
     glPopMatrix()
     glPushMatrix()
     glColor3f(0.1, 0.1, 0.1)
     glTranslatef(0.0, 0.0, 0.2)
-    gluCylinder(gluNewQuadric(), 0.05, 0.05, 0.6, 32, 8)
+    gluCylinder(quad, 0.05, 0.05, 0.6, 32, 8)
     glPopMatrix()
     glPushMatrix()
     glColor3f(0.12, 0.12, 0.12)
@@ -515,22 +685,32 @@ def draw_gun_fps():
     glPopMatrix()
     glPopMatrix()
 
+def center_pointer():
+    """Warp the pointer to the window center; the motion event the warp causes then carries no delta."""
+    global mouse_last
+    mouse_last = (window_width // 2, window_height // 2)
+    glutWarpPointer(mouse_last[0], mouse_last[1])
+
 def mouse_motion(x, y):
-    global player_yaw, player_pitch, mouse_captured
-    if game_won:
+    """Accumulate captured pointer motion for the next simulation step."""
+    global mouse_last, mouse_dx, mouse_dy
+    if game.game_won:
         return  # Ignore mouse motion if game is won
     if not mouse_captured:
         return
-    center_x = window_width // 2
-    center_y = window_height // 2
-    dx = x - center_x
-    dy = y - center_y
-    sensitivity = 0.2
-    player_yaw += dx * sensitivity
-    player_pitch -= dy * sensitivity
-    player_pitch = max(-89, min(89, player_pitch))
-    glutWarpPointer(center_x, center_y)
-    glutPostRedisplay()
+    if mouse_last is None:
+        mouse_last = (x, y)
+    dx = x - mouse_last[0]
+    dy = y - mouse_last[1]
+    if not dx and not dy:
+        return  # The event caused by our own warp
+    mouse_dx += dx
+    mouse_dy += dy
+    mouse_last = (x, y)
+    if (x < MOUSE_EDGE_MARGIN or x >= window_width - MOUSE_EDGE_MARGIN or
+            y < MOUSE_EDGE_MARGIN or y >= window_height - MOUSE_EDGE_MARGIN):
+        center_pointer()
+    wake_timer()
 
 def draw_crosshair():
     glMatrixMode(GL_PROJECTION)
@@ -545,16 +725,13 @@ def draw_crosshair():
     cx, cy = 0.5, 0.5
     r_outer = 0.015
     r_dot = 0.002
-    glBegin(GL_LINE_LOOP)
-    for i in range(64):
-        angle = 2.0 * math.pi * i / 64
-        glVertex2f(cx + math.cos(angle) * r_outer, cy + math.sin(angle) * r_outer)
-    glEnd()
-    glBegin(GL_POLYGON)
-    for i in range(32):
-        angle = 2.0 * math.pi * i / 32
-        glVertex2f(cx + math.cos(angle) * r_dot, cy + math.sin(angle) * r_dot)
-    glEnd()
+    glTranslatef(cx, cy, 0.0)
+    glPushMatrix()
+    glScalef(r_outer, r_outer, 1.0)
+    draw_circle(GL_LINE_LOOP, 64)
+    glPopMatrix()
+    glScalef(r_dot, r_dot, 1.0)
+    draw_circle(GL_POLYGON, 32)
     glEnable(GL_DEPTH_TEST)
     glPopMatrix()
     glMatrixMode(GL_PROJECTION)
@@ -562,117 +739,71 @@ def draw_crosshair():
     glMatrixMode(GL_MODELVIEW)
 
 def draw_button():
-    """Draw a vertical cylindrical button at BUTTON_POS and transparent red laser walls with a hole."""
+    """Draw the visible cylindrical buttons and transparent red button laser walls."""
+    bounds = np.array([bounds for _, bounds in button_lists]).reshape(-1, 2, 3)
+    visible = boxes_visible(bounds)
+    for (display_list, _), show in zip(button_lists, visible.tolist()):
+        if show:
+            glCallList(display_list)
+    log.debug("Drawing %d of %d buttons and button laser walls", int(visible.sum()), len(button_lists))
+
+def draw_button_geometry(quad, button):
+    """Issue a button cylinder with both caps."""
+    pos = button['pos']
     glPushMatrix()
-    glTranslatef(BUTTON_POS[0], BUTTON_POS[1], BUTTON_POS[2])
+    glTranslatef(pos[0], pos[1], pos[2])
     glRotatef(-90, 1, 0, 0)
     glColor3f(0.1, 0.2, 0.3)
     glEnable(GL_DEPTH_TEST)
-    quad = gluNewQuadric()
-    gluCylinder(quad, BUTTON_RADIUS, BUTTON_RADIUS, BUTTON_HEIGHT, 32, 8)
-    gluDisk(quad, 0.0, BUTTON_RADIUS, 32, 8)
-    glTranslatef(0.0, 0.0, BUTTON_HEIGHT)
-    gluDisk(quad, 0.0, BUTTON_RADIUS, 32, 8)
+    gluCylinder(quad, button['radius'], button['radius'], button['height'], 32, 8)
+    gluDisk(quad, 0.0, button['radius'], 32, 8)
+    glTranslatef(0.0, 0.0, button['height'])
+    gluDisk(quad, 0.0, button['radius'], 32, 8)
     glPopMatrix()
 
-    # Draw transparent red laser walls with hole at X=4-5, Y=2-3 on Z=8.5 wall
+def draw_button_laser_geometry(laser):
+    """Issue a transparent red button laser wall, split around its hole."""
     glEnable(GL_BLEND)
     glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
     glColor4f(1.0, 0.0, 0.0, 0.5)
     glBegin(GL_QUADS)
-    # Z=8.5 wall, split around X=4-5, Y=2-3
-    # Left part: X=0-4, Y=0-9
-    glVertex3f(0.0, 0.0, 8.5)
-    glVertex3f(4.0, 0.0, 8.5)
-    glVertex3f(4.0, 9.0, 8.5)
-    glVertex3f(0.0, 9.0, 8.5)
-    # Right part: X=5-9, Y=0-9
-    glVertex3f(5.0, 0.0, 8.5)
-    glVertex3f(9.0, 0.0, 8.5)
-    glVertex3f(9.0, 9.0, 8.5)
-    glVertex3f(5.0, 9.0, 8.5)
-    # Bottom part: X=4-5, Y=0-2
-    glVertex3f(4.0, 0.0, 8.5)
-    glVertex3f(5.0, 0.0, 8.5)
-    glVertex3f(5.0, 2.0, 8.5)
-    glVertex3f(4.0, 2.0, 8.5)
-    # Top part: X=4-5, Y=3-9
-    glVertex3f(4.0, 3.0, 8.5)
-    glVertex3f(5.0, 3.0, 8.5)
-    glVertex3f(5.0, 9.0, 8.5)
-    glVertex3f(4.0, 9.0, 8.5)
-    # X=9 wall (no hole)
-    glVertex3f(9.0, 0.0, 0.0)
-    glVertex3f(9.0, 0.0, 8.5)
-    glVertex3f(9.0, 9.0, 8.5)
-    glVertex3f(9.0, 9.0, 0.0)
+    draw_laser_quads(laser)
     glEnd()
     glDisable(GL_BLEND)
-    print(f"Drawing button at {BUTTON_POS}, height={BUTTON_HEIGHT}, radius={BUTTON_RADIUS}, transparent laser walls with hole at X=4-5, Y=2-3, Z=8.5")
+
+def draw_laser_quads(laser):
+    """Issue GL_QUADS vertices covering a laser wall; a hole splits it into left, right, bottom and top parts."""
+    u, v = laser['plane_axes']
+    lo, hi = laser['min'], laser['max']
+    rects = [(lo[u], lo[v], hi[u], hi[v])]
+    if laser['hole']:
+        hole_lo, hole_hi = laser['hole_min'], laser['hole_max']
+        rects = [(lo[u], lo[v], hole_lo[u], hi[v]), (hole_hi[u], lo[v], hi[u], hi[v]),
+                 (hole_lo[u], lo[v], hole_hi[u], hole_lo[v]), (hole_lo[u], hole_hi[v], hole_hi[u], hi[v])]
+    point = [laser['value']] * 3
+    for u0, v0, u1, v1 in rects:
+        for pu, pv in ((u0, v0), (u1, v0), (u1, v1), (u0, v1)):
+            point[u] = pu
+            point[v] = pv
+            glVertex3f(point[0], point[1], point[2])
 
 def draw_laser_door():
-    """Draw a transparent red laser wall across the front wall, unless door is green."""
-    if button_activated:
-        print("Door is green, skipping door laser wall draw")
+    """Draw the transparent red door laser walls, unless door is green."""
+    if game.button_activated:
+        log.debug("Door is green, skipping door laser wall draw")
         return
     glPushMatrix()
     glEnable(GL_BLEND)
     glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
     glColor4f(1, 0.0, 0, 0.2)
     glBegin(GL_QUADS)
-    glVertex3f(0.0, 0.0, 15.0)
-    glVertex3f(20.0, 0.0, 15.0)
-    glVertex3f(20.0, 9.0, 15.0)
-    glVertex3f(0.0, 9.0, 15.0)
+    for laser, show in zip(game.lasers, boxes_visible(laser_bounds).tolist()):
+        if laser['guarded'] and show:
+            draw_laser_quads(laser)
     glEnd()
     glDisable(GL_BLEND)
     glPopMatrix()
-    print("Drawing transparent door laser wall at X=0-20, Y=0-9, Z=15.0")
-
-def check_button_interaction():
-    """Check if player steps on the button and set door color to green permanently."""
-    global door_color, button_activated
-    if game_won:
-        return  # Skip button interaction if game is won
-    if button_activated:
-        return
-    dx = player_pos[0] - BUTTON_POS[0]
-    dz = player_pos[2] - BUTTON_POS[2]
-    distance = math.sqrt(dx**2 + dz**2)
-    if distance <= BUTTON_RADIUS and player_pos[1] <= BUTTON_HEIGHT + 0.1:
-        door_color = 'green'
-        button_activated = True
-        print(f"Player at {player_pos} stepped on button: Door color set to green permanently, game_won={game_won}")
-    else:
-        print(f"Player at {player_pos}, button not activated yet, game_won={game_won}")
-
-def draw_tile_with_door_color(tile):
-    """Wrap draw_tile to apply door color to door tiles (cols 4-8, rows 0-1)."""
-    coords, color = tile
-    x_min = min(v[0] for v in coords)
-    x_max = max(v[0] for v in coords)
-    y_min = min(v[1] for v in coords)
-    z_min = min(v[2] for v in coords)
-    is_door_tile = (abs(z_min - room_size) < 0.1 and
-                    y_min < 6.0 and
-                    6.67 - 0.1 <= x_min <= 13.33 + 0.1)
-    if is_door_tile:
-        print(f"Door tile detected at x_min={x_min:.2f}, y_min={y_min:.2f}, z_min={z_min:.2f}, applying {door_color}")
-        glEnable(GL_POLYGON_OFFSET_FILL)
-        glPolygonOffset(1.0, 1.0)
-        glColor3f(0.0, 1.0, 0.0) if door_color == 'green' else glColor3f(1.0, 0.0, 0.0)
-        glBegin(GL_QUADS)
-        for vertex in coords:
-            glVertex3fv(vertex)
-        glEnd()
-        glDisable(GL_POLYGON_OFFSET_FILL)
-        glColor3f(0.0, 0.0, 0.0)
-        glBegin(GL_LINE_LOOP)
-        for vertex in coords:
-            glVertex3fv(vertex)
-        glEnd()
-    else:
-        draw_tile(tile)
+    log.debug("Drawing transparent door laser walls")
 
 def draw_win_message():
     """Draw 'You Have Cleared This Level' in the center of the screen."""
@@ -700,51 +831,98 @@ def draw_win_message():
     glMatrixMode(GL_MODELVIEW)
 
 def display():
+    global frame_dirty, redraw_pending, last_frame_time
+    frame_dirty = False
+    redraw_pending = False
+    last_frame_time = time.perf_counter()
+    with profiler.phase('frame'):
+        draw_frame()
+
+def draw_frame():
+    """Draw the scene, HUD and overlay, timing each phase, and swap buffers."""
+    global view_frustum
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
     glLoadIdentity()
-    if not game_won:
-        check_player_tile_collision()
-        check_door_collision()
-        check_button_laser_collision()
-        check_button_interaction()
-        print(f"Player position: {player_pos}, is_falling={is_falling}, door_color={door_color}, button_activated={button_activated}, game_won={game_won}")
-        lx = math.sin(math.radians(player_yaw)) * math.cos(math.radians(player_pitch))
-        ly = math.sin(math.radians(player_pitch))
-        lz = -math.cos(math.radians(player_yaw)) * math.cos(math.radians(player_pitch))
-        gluLookAt(player_pos[0], player_pos[1] + 2.5, player_pos[2],
-                  player_pos[0] + lx, player_pos[1] + 2.5 + ly, player_pos[2] + lz,
-                  0, 1, 0)
-        draw_floor_and_ceiling()
-        draw_button()
-        draw_laser_door()
-        for tile in wall_tiles:
-            draw_tile_with_door_color(tile)
-        for bullet in bullets:
-            draw_bullet(bullet)
-        glLoadIdentity()
-        glDisable(GL_DEPTH_TEST)
-        draw_gun_fps()
-        glEnable(GL_DEPTH_TEST)
-        draw_crosshair()
-    if game_won:
-        draw_win_message()
-    glutSwapBuffers()
-
-def boundary_player_position():
-    min_x, max_x = 0.1, 19.9
-    min_z, max_z = 0.1, 19.9
-    player_pos[0] = max(min_x, min(max_x, player_pos[0]))
-    player_pos[2] = max(min_z, min(max_z, player_pos[2]))
+    if not game.game_won:
+        with profiler.phase('camera'):
+            player_pos = render_player_pos()
+            log.debug("Player position: %s, is_falling=%s, door_color=%s, button_activated=%s, game_won=%s",
+                      game.player_pos, game.is_falling, game.door_color, game.button_activated, game.game_won)
+            lx, ly, lz = look_direction(game.player_yaw, game.player_pitch)
+            eye = (player_pos[0], player_pos[1] + EYE_HEIGHT, player_pos[2])
+            gluLookAt(eye[0], eye[1], eye[2],
+                      eye[0] + lx, eye[1] + ly, eye[2] + lz,
+                      0, 1, 0)
+            view_frustum = frustum_planes(eye, (lx, ly, lz), window_width / float(window_height))
+        with profiler.phase('floor_ceiling'):
+            draw_floor_and_ceiling()
+        with profiler.phase('button'):
+            draw_button()
+        with profiler.phase('laser_door'):
+            draw_laser_door()
+        with profiler.phase('tiles'):
+            draw_walls()
+        with profiler.phase('bullets'):
+            bullets = game.bullets
+            n = bullets.count
+            positions = bullets.prev_pos[:n] + (bullets.pos[:n] - bullets.prev_pos[:n]) * render_alpha
+            visible = spheres_visible(positions, BULLET_RADIUS)
+            draw_bullets(positions[visible], bullets.color[:n][visible])
+        with profiler.phase('hud'):
+            glLoadIdentity()
+            glDisable(GL_DEPTH_TEST)
+            draw_gun_fps()
+            glEnable(GL_DEPTH_TEST)
+            draw_crosshair()
+    if game.game_won:
+        with profiler.phase('hud'):
+            draw_win_message()
+    if overlay_visible:
+        with profiler.phase('overlay'):
+            draw_profile_overlay()
+    with profiler.phase('swap'):
+        glutSwapBuffers()
+
+def draw_profile_overlay():
+    """Draw the profiler report in the top-left corner from a display list rebuilt every OVERLAY_REFRESH seconds."""
+    global overlay_list, overlay_time
+    now = time.perf_counter()
+    if overlay_list is None or now - overlay_time >= OVERLAY_REFRESH:
+        if overlay_list is None:
+            overlay_list = glGenLists(1)
+        overlay_time = now
+        glNewList(overlay_list, GL_COMPILE)
+        font = GLUT_BITMAP_8_BY_13
+        for row, line in enumerate(profiler.format()):
+            glRasterPos2f(10, window_height - 20 - 15 * row)
+            for char in line:
+                glutBitmapCharacter(font, ord(char))
+        glEndList()
+    glMatrixMode(GL_PROJECTION)
+    glPushMatrix()
+    glLoadIdentity()
+    glOrtho(0, window_width, 0, window_height, -1, 1)
+    glMatrixMode(GL_MODELVIEW)
+    glPushMatrix()
+    glLoadIdentity()
+    glDisable(GL_DEPTH_TEST)
+    glColor3f(1.0, 1.0, 1.0)
+    glCallList(overlay_list)
+    glEnable(GL_DEPTH_TEST)
+    glPopMatrix()
+    glMatrixMode(GL_PROJECTION)
+    glPopMatrix()
+    glMatrixMode(GL_MODELVIEW)
 
 def special_keys(key, x, y):
-    global player_yaw
-    if game_won:
+    if game.game_won:
         return  # Ignore special keys if game is won
-    if key == GLUT_KEY_LEFT:
-        player_yaw -= yaw_speed
-    elif key == GLUT_KEY_RIGHT:
-        player_yaw += yaw_speed
-    glutPostRedisplay()
+    if key in (GLUT_KEY_LEFT, GLUT_KEY_RIGHT):
+        keys_down.add(key)  # Turned by the simulation step while held
+        wake_timer()
+
+def special_keys_up(key, x, y):
+    keys_down.discard(key)
 
 def reshape(w, h):
     global window_width, window_height
@@ -753,23 +931,59 @@ def reshape(w, h):
     glViewport(0, 0, w, h)
     glMatrixMode(GL_PROJECTION)
     glLoadIdentity()
-    gluPerspective(60, w / float(h), 0.1, 100)
+    gluPerspective(FIELD_OF_VIEW, w / float(h), NEAR_PLANE, FAR_PLANE)
     glMatrixMode(GL_MODELVIEW)
+    request_redraw()
 
 def init():
-    global room_size, wall_tiles
     glEnable(GL_DEPTH_TEST)
     glEnable(GL_BLEND)
     glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
     glClearColor(0.2, 0.2, 0.2, 1)
-    wall_tiles.clear()
-    create_wall_with_tiles((0, 0), (room_size, 0))
-    create_wall_with_tiles((room_size, 0), (room_size, room_size))
-    create_short_wall_with_tiles_with_door((room_size, room_size), (0, room_size))
-    create_wall_with_tiles((0, room_size), (0, 0))
-    glutTimerFunc(0, timer, 0)
+    build_wall_mesh()
+    build_static_meshes()
+    build_circle_meshes()
+    build_bullet_mesh()
+    glutTimerFunc(0, timer, timer_generation)
+
+def dump_profile(path):
+    profiler.dump(path)
+    log.info("Wrote frame profile to %s", path)
+
+def dump_gl_profile(path):
+    """Write the per-entry-point GL call profile as a Chrome trace and log the costliest calls."""
+    callprofile.PROFILER.dumpChromeTrace(path)
+    for line in callprofile.PROFILER.formatReport(GL_PROFILE_TOP):
+        log.info("%s", line)
+    log.info("Wrote GL call trace to %s", path)
+
+def stop_recording():
+    if recorder is not None:
+        recorder.close(sim_tick, game)
 
 def main():
+    global recorder, replay_player
+    portal_log.configure()
+    gl_error.setErrorChecking(False, functions=UNCHECKED_GL_CALLS)
+    if '--level' in sys.argv:
+        game.load_level(portal_level.load(sys.argv[sys.argv.index('--level') + 1]))
+    if '--record' in sys.argv:
+        recorder = portal_replay.Recorder(sys.argv[sys.argv.index('--record') + 1], SIM_DT, game.level)
+        atexit.register(stop_recording)
+    elif '--replay' in sys.argv:
+        recording = portal_replay.load(sys.argv[sys.argv.index('--replay') + 1])
+        if recording.dt != SIM_DT:
+            log.warning("Recording uses a %.4fs step, replaying at that step", recording.dt)
+        replay_player = portal_replay.Player(recording, game)
+    if '--profile' in sys.argv:
+        profiler.count_gl_calls(globals())
+        atexit.register(dump_profile, sys.argv[sys.argv.index('--profile') + 1])
+    if '--gl-profile' in sys.argv:
+        if callprofile.CALL_PROFILING:
+            callprofile.PROFILER.configure(tracing=True)
+            atexit.register(dump_gl_profile, sys.argv[sys.argv.index('--gl-profile') + 1])
+        else:
+            log.warning("--gl-profile needs PYOPENGL_CALL_PROFILING=1 set in the environment")
     glutInit()
     glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH)
     glutInitWindowSize(window_width, window_height)
@@ -777,8 +991,11 @@ def main():
     init()
     glutDisplayFunc(display)
     glutReshapeFunc(reshape)
+    glutIgnoreKeyRepeat(1)
     glutKeyboardFunc(keyboard)
+    glutKeyboardUpFunc(keyboard_up)
     glutSpecialFunc(special_keys)
+    glutSpecialUpFunc(special_keys_up)
     glutPassiveMotionFunc(mouse_motion)
     glutMouseFunc(mouse)
     glutMainLoop()
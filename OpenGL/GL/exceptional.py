@@ -40,9 +40,15 @@ if _configflags.ERROR_CHECKING:
         return baseFunction( mode )
     @_lazy( full.glEnd )
     def glEnd( baseFunction ):
-        """Finish GL geometry-definition mode, re-enable automatic error checking"""
+        """Finish GL geometry-definition mode, re-enable automatic error checking
+
+        A deferred error checker set to flush on 'end' checks here.
+        """
         _errors._error_checker.onEnd( )
-        return baseFunction( )
+        result = baseFunction( )
+        if getattr( _errors._error_checker, "deferred", False ):
+            _errors._error_checker.flushErrors( 'end' )
+        return result
 else:
     glBegin = full.glBegin
     glEnd = full.glEnd
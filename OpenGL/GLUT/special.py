@@ -22,7 +22,7 @@ platform module *not* in the module here!
 """
 from OpenGL.platform import CurrentContextIsValid, GLUT_GUARD_CALLBACKS, PLATFORM
 GLUT = PLATFORM.GLUT
-from OpenGL import contextdata, error, platform, logs
+from OpenGL import callprofile, contextdata, error, platform, logs
 from OpenGL.raw import GLUT as _simple
 from OpenGL._bytes import bytes, unicode,as_8_bit
 import ctypes, os, sys, traceback
@@ -350,3 +350,15 @@ def glutDestroyWindow( window ):
         _log.error( """Error attempting to clean up context data for GLUT window %s: %s""", window, result )
     return _base_glutDestroyWindow( window )
 glutDestroyWindow.wrappedOperation = _simple.glutDestroyWindow
+
+def glutSwapBuffers( ):
+    """Swap buffers, then flush deferred GL error checks set to flush on 'swap'
+
+    Also ends the frame for GL call profiling (see OpenGL.callprofile).
+    """
+    result = _simple.glutSwapBuffers( )
+    if callprofile.CALL_PROFILING:
+        callprofile.PROFILER.frame( )
+    error.flushErrors( 'swap' )
+    return result
+glutSwapBuffers.wrappedOperation = _simple.glutSwapBuffers
@@ -33,8 +33,28 @@ import occurs the flags should no longer be changed.
         i.e. where you are explicitly checking for errors
         everywhere they can occur in your code.
 
+        With ERROR_CHECKING on, OpenGL.error.setErrorChecking
+        can switch checking off (and back on) at runtime,
+        globally, per GL module or per function.
+
         Default: True
 
+    DEFERRED_ERROR_CHECKING -- if set to a True value (along
+        with ERROR_CHECKING) before importing any OpenGL.*
+        libraries, wrapped calls only record themselves in a
+        small ring buffer instead of calling glGetError, and
+        errors are checked once at a boundary: glutSwapBuffers,
+        glEnd or an explicit OpenGL.error.flushErrors(), as set
+        with _ErrorChecker.setDeferred().  An error found at a
+        boundary is raised with the recorded calls attached and
+        the following interval is checked call-by-call to
+        pinpoint the offending call.
+
+        This keeps error detection in production code for the
+        cost of about one glGetError per frame.
+
+        Default: False
+
     ERROR_LOGGING -- If True, then wrap array-handler
         functions with  error-logging operations so that all exceptions
         will be reported to log objects in OpenGL.logs, note that
@@ -128,6 +148,16 @@ import occurs the flags should no longer be changed.
 
         Default: False
 
+    CALL_PROFILING -- If True, then wrap functions with
+        profiling proxies which count and time every call per GL
+        entry point in OpenGL.callprofile.PROFILER, aggregated per
+        frame (PROFILER.frame(), called by glutSwapBuffers), with
+        optional sampling and text, JSON or Chrome-trace export.
+        Much cheaper than FULL_LOGGING, but still only meant for
+        profiling runs.
+
+        Default: False
+
     ALLOW_NUMPY_SCALARS -- if True, we will wrap
         all GLint/GLfloat calls conversions with wrappers
         that allow for passing numpy scalar values.
@@ -194,6 +224,7 @@ def environ_key(name, default):
 
 
 ERROR_CHECKING = environ_key("ERROR_CHECKING", True)
+DEFERRED_ERROR_CHECKING = environ_key("DEFERRED_ERROR_CHECKING", False)
 ERROR_LOGGING = environ_key("ERROR_LOGGING", False)
 ERROR_ON_COPY = environ_key("ERROR_ON_COPY", False)
 ARRAY_SIZE_CHECKING = environ_key("ARRAY_SIZE_CHECKING", True)
@@ -205,6 +236,7 @@ USE_ACCELERATE = environ_key("USE_ACCELERATE", True)
 CONTEXT_CHECKING = environ_key("CONTEXT_CHECKING", False)
 
 FULL_LOGGING = environ_key("FULL_LOGGING", False)
+CALL_PROFILING = environ_key("CALL_PROFILING", False)
 ALLOW_NUMPY_SCALARS = environ_key("ALLOW_NUMPY_SCALARS", False)
 UNSIGNED_BYTE_IMAGES_AS_STRING = environ_key("UNSIGNED_BYTE_IMAGES_AS_STRING", True)
 MODULE_ANNOTATIONS = False
@@ -1,6 +1,7 @@
 """Holds the import-time constants for various configuration flags"""
 from OpenGL import (
     ERROR_CHECKING,
+    DEFERRED_ERROR_CHECKING,
     ERROR_LOGGING,
     ERROR_ON_COPY,
     ARRAY_SIZE_CHECKING,
@@ -12,6 +13,7 @@ from OpenGL import (
     CONTEXT_CHECKING,
 
     FULL_LOGGING,
+    CALL_PROFILING,
     ALLOW_NUMPY_SCALARS,
     UNSIGNED_BYTE_IMAGES_AS_STRING,
     MODULE_ANNOTATIONS,
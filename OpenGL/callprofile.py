@@ -0,0 +1,219 @@
+"""Low-overhead per-entry-point GL call profiling
+
+With CALL_PROFILING set (PYOPENGL_CALL_PROFILING=1) before the first
+OpenGL.* import, BasePlatform.constructFunction wraps every entry point
+in a _ProfiledFunction which counts its calls in PROFILER and times them
+(optionally only every sampleEvery'th call).  Timings are CPU wall time
+of the base function, i.e. the ctypes call plus its error check, which
+is when the driver accepts the command rather than when the GPU runs it.
+
+Calls are aggregated per frame: call PROFILER.frame() at the end of each
+frame (glutSwapBuffers does so itself).  report() and formatReport()
+summarise the totals and per-frame averages, dumpReport() writes them
+out and dumpChromeTrace() writes sampled calls and frames as a Chrome
+trace (chrome://tracing, Perfetto).
+"""
+import collections, json, time
+from OpenGL._configflags import CALL_PROFILING
+
+# frames kept for per-frame statistics
+DEFAULT_FRAMES = 600
+# sampled calls kept for Chrome traces when tracing
+DEFAULT_TRACE_EVENTS = 100000
+
+class CallProfiler( object ):
+    """Accumulates call counts and times per GL entry point
+
+    Attributes:
+
+        enabled -- if False, profiled functions just call through
+        sampleEvery -- time one call in this many per entry point and
+            frame (all are counted)
+        tracing -- if True, keep sampled calls for dumpChromeTrace
+        current -- name: [calls, timed calls, timed seconds] for the
+            frame in progress
+        totals -- the same, for all finished frames
+        frames -- (start, end, current) of recent finished frames
+        events -- (name, start, seconds) of recent timed calls, when tracing
+    """
+    def __init__( self, sampleEvery=1, tracing=False, frames=DEFAULT_FRAMES, traceEvents=DEFAULT_TRACE_EVENTS ):
+        self.enabled = True
+        self.sampleEvery = sampleEvery
+        self.tracing = tracing
+        self.calls = 0
+        self.current = {}
+        self.totals = {}
+        self.frames = collections.deque( maxlen=frames )
+        self.events = collections.deque( maxlen=traceEvents )
+        self.started = self.frameStart = time.perf_counter()
+    def configure( self, enabled=None, sampleEvery=None, tracing=None ):
+        """Change the given settings, leaving the others as they are"""
+        if enabled is not None:
+            self.enabled = enabled
+        if sampleEvery is not None:
+            self.sampleEvery = max( 1, int(sampleEvery) )
+        if tracing is not None:
+            self.tracing = tracing
+    def reset( self ):
+        """Drop all statistics and trace events"""
+        self.calls = 0
+        self.current = {}
+        self.totals = {}
+        self.frames.clear()
+        self.events.clear()
+        self.started = self.frameStart = time.perf_counter()
+    def frame( self ):
+        """Finish the current frame, folding its statistics into the totals"""
+        now = time.perf_counter()
+        current, self.current = self.current, {}
+        for name, (calls, timed, seconds) in current.items():
+            total = self.totals.get( name )
+            if total is None:
+                self.totals[name] = [calls, timed, seconds]
+            else:
+                total[0] += calls
+                total[1] += timed
+                total[2] += seconds
+        self.frames.append( (self.frameStart, now, current) )
+        self.frameStart = now
+    def report( self ):
+        """Return one dict per entry point, most total time first
+
+        Times of sampled profiles are estimated per entry point, from
+        the mean of its own timed calls.
+        The per-frame figures average over the frames still kept.
+        """
+        combined = {}
+        for stats in (self.totals, self.current):
+            for name, (calls, timed, seconds) in stats.items():
+                row = combined.setdefault( name, [0, 0, 0.0] )
+                row[0] += calls
+                row[1] += timed
+                row[2] += seconds
+        perFrame = {}
+        for start, end, current in self.frames:
+            for name, (calls, timed, seconds) in current.items():
+                row = perFrame.setdefault( name, [0, 0, 0.0] )
+                row[0] += calls
+                row[1] += timed
+                row[2] += seconds
+        frameCount = max( 1, len(self.frames) )
+        rows = []
+        for name, (calls, timed, seconds) in combined.items():
+            mean = seconds/timed if timed else 0.0
+            frameCalls = perFrame.get( name, (0, 0, 0.0) )[0]
+            rows.append({
+                'function': name,
+                'calls': calls,
+                'timed_calls': timed,
+                'total_ms': mean*calls*1e3,
+                'mean_us': mean*1e6,
+                'calls_per_frame': frameCalls/float(frameCount),
+                'ms_per_frame': mean*frameCalls*1e3/frameCount,
+            })
+        rows.sort( key=lambda row: row['total_ms'], reverse=True )
+        return rows
+    def formatReport( self, limit=None ):
+        """Return the report as aligned text lines"""
+        lines = [
+            '%-32s %10s %10s %9s %11s %9s'%(
+                'function', 'calls', 'total ms', 'mean us', 'calls/frame', 'ms/frame',
+            )
+        ]
+        for row in self.report()[:limit]:
+            lines.append( '%-32s %10d %10.2f %9.2f %11.1f %9.3f'%(
+                row['function'], row['calls'], row['total_ms'], row['mean_us'],
+                row['calls_per_frame'], row['ms_per_frame'],
+            ))
+        return lines
+    def dumpReport( self, path ):
+        """Write the report to path, as JSON if path ends in .json, else as text"""
+        with open( path, 'w' ) as f:
+            if path.endswith( '.json' ):
+                json.dump( {
+                    'frames': len(self.frames),
+                    'sampleEvery': self.sampleEvery,
+                    'functions': self.report(),
+                }, f, indent=2 )
+            else:
+                f.write( '\n'.join( self.formatReport() ) + '\n' )
+    def chromeTrace( self ):
+        """Return the kept frames and timed calls as a Chrome trace dict
+
+        Frames are complete events on thread 0, with a counter of the
+        frame's GL calls; timed calls are complete events on thread 1.
+        """
+        def us( seconds ):
+            return (seconds - self.started)*1e6
+        events = []
+        for index, (start, end, current) in enumerate( self.frames ):
+            events.append({
+                'name': 'frame', 'ph': 'X', 'pid': 1, 'tid': 0,
+                'ts': us(start), 'dur': (end-start)*1e6, 'args': {'index': index},
+            })
+            events.append({
+                'name': 'GL calls', 'ph': 'C', 'pid': 1, 'tid': 0, 'ts': us(start),
+                'args': {'calls': sum( stats[0] for stats in current.values() )},
+            })
+        for name, start, seconds in self.events:
+            events.append({
+                'name': name, 'ph': 'X', 'pid': 1, 'tid': 1,
+                'ts': us(start), 'dur': seconds*1e6,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+    def dumpChromeTrace( self, path ):
+        """Write chromeTrace() to path as JSON"""
+        with open( path, 'w' ) as f:
+            json.dump( self.chromeTrace(), f )
+
+PROFILER = CallProfiler()
+
+class _ProfiledFunction( object ):
+    """Proxy that overrides __call__ to count and time calls in a CallProfiler"""
+    def __init__( self, base, profiler ):
+        self.__dict__[''] = base
+        self.__dict__['profiler'] = profiler
+    def __setattr__( self, key, value ):
+        if key != '':
+            setattr( self.__dict__[''], key, value )
+        else:
+            self.__dict__[''] = value
+    def __getattr__( self, key ):
+        if key == '':
+            return self.__dict__['']
+        else:
+            return getattr( self.__dict__[''], key )
+    def __call__( self, *args, **named ):
+        function = self.__dict__['']
+        profiler = self.__dict__['profiler']
+        if not profiler.enabled:
+            return function( *args, **named )
+        name = function.__name__
+        stats = profiler.current.get( name )
+        if stats is None:
+            stats = profiler.current[name] = [0, 0, 0.0]
+        calls = stats[0]
+        stats[0] = calls + 1
+        profiler.calls += 1
+        # sample on this entry point's own count, so periodic call patterns
+        # cannot leave an entry point untimed; its first call each frame is timed
+        if calls % profiler.sampleEvery:
+            return function( *args, **named )
+        start = time.perf_counter()
+        try:
+            return function( *args, **named )
+        finally:
+            seconds = time.perf_counter() - start
+            stats[1] += 1
+            stats[2] += seconds
+            if profiler.tracing:
+                profiler.events.append( (name, start, seconds) )
+
+def profileCalls( function, profiler=None ):
+    """Produce possibly profiled version of function
+
+    Uses CALL_PROFILING to determine whether to wrap the function.
+    """
+    if CALL_PROFILING:
+        return _ProfiledFunction( function, profiler or PROFILER )
+    return function
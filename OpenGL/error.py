@@ -6,15 +6,25 @@ such as TypeError or ValueError when appropriate.
 ErrorChecker is an _ErrorChecker instance that allows you
 to register a new error-checking function for use 
 throughout the system.
+
+With DEFERRED_ERROR_CHECKING (or _ErrorChecker.setDeferred)
+the checkers only record calls, and flushErrors() checks for
+errors at a boundary the application chooses.
 """
-import logging
+import collections, logging
 _log = logging.getLogger( 'OpenGL.error' )
 from OpenGL import platform, _configflags
 from ctypes import ArgumentError
 __all__ = (
     "Error",'GLError','GLUError','GLUTError',
     'GLerror','GLUerror','GLUTerror','ArgumentError',
+    'flushErrors','flush_errors','setErrorChecking',
 )
+# number of calls a deferred checker remembers between flushes
+DEFERRED_RECENT_CALLS = 32
+# boundaries at which deferred checkers flush by default
+DEFERRED_FLUSH_ON = ('swap',)
+_checkers = []
 
 class Error( Exception ):
     """Base class for all PyOpenGL-specific exception classes"""
@@ -57,7 +67,12 @@ class GLError( Error ):
         cArguments -- ctypes-level arguments to the operation,
             often raw integers for pointers and the like
         description -- OpenGL description of the error (textual)
+        recentCalls -- for errors found by a deferred flush, the
+            (baseOperation, cArguments) of the calls recorded since
+            the previous flush, oldest first, one of which raised
+            the error
     """
+    recentCalls = None
     def __init__( 
         self, 
         err=None, 
@@ -86,6 +101,7 @@ class GLError( Error ):
         'cArgs',
         'cArguments',
         'result', 
+        'recentCalls',
     )
     def __str__( self ):
         """Create a fully formatted representation of the error"""
@@ -151,6 +167,15 @@ class GLError( Error ):
             return '%s = %s'%( property, value.__name__ )
         else:
             return '%s = %r'%( property, value )
+    def format_recentCalls( self, property, value ):
+        """Format recorded (baseOperation, cArguments) calls one per line"""
+        return '%s = [\n\t\t%s\n\t]'%( property, ",\n\t\t".join([
+            '%s%s'%(
+                getattr( baseOperation, '__name__', baseOperation ),
+                self.shortRepr( tuple(cArguments or ()) ),
+            )
+            for (baseOperation,cArguments) in value
+        ]))
 
 class GLUError( Error ):
     """GLU error implementation class"""
@@ -163,7 +188,8 @@ class EGLError( GLError ):
 if _configflags.ERROR_CHECKING:
     from OpenGL import acceleratesupport
     _ErrorChecker = None
-    if acceleratesupport.ACCELERATE_AVAILABLE:
+    # the accelerated checker has no deferred mode
+    if acceleratesupport.ACCELERATE_AVAILABLE and not _configflags.DEFERRED_ERROR_CHECKING:
         try:
             from OpenGL_accelerate.errorchecker import _ErrorChecker
         except ImportError as err:
@@ -176,14 +202,23 @@ if _configflags.ERROR_CHECKING:
                 _registeredChecker -- the checking function enabled when 
                     not doing onBegin/onEnd processing
                 _currentChecker -- currently active checking function
+                _deferring -- whether glCheckError records calls into
+                    _recent instead of checking (deferred mode, outside
+                    of a pinpointing interval)
+                flushOn -- boundaries ('swap', 'end') at which
+                    flushErrors( boundary ) checks in deferred mode
             """
             _getErrors = None
+            deferred = False
+            _deferring = False
+            flushOn = ()
             def __init__( self, platform, baseOperation=None, noErrorResult=0, errorClass=GLError ):
                 """Initialize from a platform module/reference"""
                 self._isValid = platform.CurrentContextIsValid
                 self._getErrors = baseOperation
                 self._noErrorResult = noErrorResult
                 self._errorClass = errorClass
+                self._recent = collections.deque( maxlen=DEFERRED_RECENT_CALLS )
                 if self._getErrors:
                     if _configflags.CONTEXT_CHECKING:
                         self._registeredChecker = self.safeGetError 
@@ -192,6 +227,9 @@ if _configflags.ERROR_CHECKING:
                 else:
                     self._registeredChecker = self.nullGetError
                 self._currentChecker = self._registeredChecker
+                _checkers.append( self )
+                if _configflags.DEFERRED_ERROR_CHECKING and self:
+                    self.setDeferred( True )
             def __bool__( self ):
                 """We are "true" if we actually do anything"""
                 if self._registeredChecker is self.nullGetError:
@@ -224,7 +262,12 @@ if _configflags.ERROR_CHECKING:
                     prevent glGetError being called during a glBegin/glEnd 
                     sequence.  If you are calling glBegin/glEnd in C you 
                     should call onBegin and onEnd appropriately.
+
+                In deferred mode the call is only recorded, see flushErrors.
                 """
+                if self._deferring:
+                    self._recent.append( (baseOperation, cArguments) )
+                    return result
                 err = self._currentChecker()
                 if err != self._noErrorResult:
                     raise self._errorClass(
@@ -240,8 +283,86 @@ if _configflags.ERROR_CHECKING:
             def onEnd( self ):
                 """Called by glEnd to record the fact that glGetError will work"""
                 self._currentChecker = self._registeredChecker
+            def setDeferred( self, deferred=True, flushOn=DEFERRED_FLUSH_ON ):
+                """Switch between per-call and deferred error checking
+
+                deferred -- if True, calls are recorded rather than checked
+                    and errors are only looked for by flushErrors
+                flushOn -- boundaries at which flushErrors( boundary ) checks,
+                    any of 'swap' (glutSwapBuffers) and 'end' (glEnd); an
+                    explicit flushErrors() always checks
+
+                Errors already pending when switching are reported by the
+                next check either way.
+                """
+                self.deferred = bool(deferred)
+                self.flushOn = frozenset( flushOn or () )
+                self._deferring = self.deferred
+                self._recent.clear()
+            def flushErrors( self, boundary=None ):
+                """Check for errors accumulated since the last flush
+
+                boundary -- None for an explicit flush, otherwise the name
+                    of the boundary reached, which is ignored unless it is
+                    in self.flushOn
+
+                Does nothing unless deferred, or inside glBegin/glEnd
+                (where glGetError is itself an error).  Raises errorClass
+                for the first pending error, with the calls recorded since
+                the previous flush as recentCalls; the remaining error
+                flags are cleared.  The checker then checks after every
+                call until the next flush, so a repeat of the error is
+                raised by the offending call itself, after which deferred
+                checking resumes.
+                """
+                if not self.deferred:
+                    return None
+                if boundary is not None and boundary not in self.flushOn:
+                    return None
+                if self._currentChecker is not self._registeredChecker:
+                    return None
+                recent = list( self._recent )
+                self._recent.clear()
+                err = self._currentChecker()
+                if err is None or err == self._noErrorResult:
+                    self._deferring = True
+                    return None
+                # glGetError returns one flag per call, drain the rest
+                for i in range( DEFERRED_RECENT_CALLS ):
+                    extra = self._currentChecker()
+                    if extra is None or extra == self._noErrorResult:
+                        break
+                    _log.warning( 'Further deferred GL error: %s', extra )
+                self._deferring = False
+                error = self._errorClass( err )
+                error.recentCalls = recent
+                raise error
 else:
     _ErrorChecker = None
+
+def flushErrors( boundary=None ):
+    """Check deferred error checkers for errors since their last flush
+
+    boundary -- None to check now, or the boundary reached ('swap', 'end'),
+        which only checks checkers set to flush on it
+
+    See _ErrorChecker.flushErrors, this is a no-op for checkers which are
+    not deferred.
+    """
+    for checker in _checkers:
+        if checker.deferred:
+            checker.flushErrors( boundary )
+flush_errors = flushErrors
+
+def setErrorChecking( enabled, modules=(), functions=() ):
+    """Enable or disable error checking at runtime, globally or per module/function
+
+    e.g. setErrorChecking( False, functions=('glVertex3f','glColor3f') )
+
+    See BasePlatform.setErrorChecking
+    """
+    return platform.PLATFORM.setErrorChecking( enabled, modules=modules, functions=functions )
+
 # Compatibility with PyOpenGL 2.x series
 GLUerror = GLUError
 GLerror = GLError 
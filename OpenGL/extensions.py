@@ -253,4 +253,4 @@ def alternate( name, *functions ):
     if not isinstance( name, (bytes,unicode)):
         functions = (name,)+functions
         name = name.__name__
-    return type( name, (_Alternate,), {} )( name, *functions )
+    return type( name, (_Alternate,), {'bindFinalCall': True} )( name, *functions )
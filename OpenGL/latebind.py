@@ -12,15 +12,24 @@ if LateBind is None:
 
         When called without self._finalCall() makes a call to
         self.finalise() and then calls self._finalCall()
+
+        Classes created for a single instance (the per-function classes of
+        wrapper.wrapper and extensions.alternate) set bindFinalCall, and
+        once finalised have their __call__ replaced by the final callable,
+        so steady-state calls skip this trampoline entirely.
         """
         _finalCall = None
+        bindFinalCall = False
         def setFinalCall( self, finalCall ):
             """Set our finalCall to the callable object given"""
             self._finalCall = finalCall
+            cls = self.__class__
+            if finalCall is not None and cls.__dict__.get( 'bindFinalCall' ):
+                cls.__call__ = staticmethod( finalCall )
         def getFinalCall( self ):
             """Retrieve and/or bind and retrieve final call"""
             if not self._finalCall:
-                self._finalCall = self.finalise()
+                self.setFinalCall( self.finalise() )
             return self._finalCall
 
 
@@ -43,7 +52,7 @@ if LateBind is None:
                 return self._finalCall( *args, **named )
             except (TypeError,AttributeError) as err:
                 if self._finalCall is None:
-                    self._finalCall = self.finalise()
+                    self.setFinalCall( self.finalise() )
                 return self._finalCall( *args, **named )
 if Curry is None:
     class Curry(object):
@@ -3,9 +3,9 @@
 import ctypes
 from OpenGL.platform import ctypesloader
 from OpenGL._bytes import as_8_bit
-import sys, logging
+import sys, logging, re
 from OpenGL import _configflags
-from OpenGL import logs, MODULE_ANNOTATIONS
+from OpenGL import callprofile, logs, MODULE_ANNOTATIONS
 log = logging.getLogger(__name__)
 
 class lazy_property( object ):
@@ -40,6 +40,21 @@ class _CheckContext( object ):
             raise error.NoContext( self.func.__name__, args, named )
         return self.func( *args, **named )
 
+VERSION_MODULE = re.compile( r'^([A-Z]+[0-9]*)_[0-9]+_[0-9]+$' )
+def _extensionName( module ):
+    """Extension name (e.g. GL_VERSION_GL_1_1) of a GL module or name
+
+    Accepts wrapper or raw modules (anything with _EXTENSION_NAME), full
+    extension names and version-module names such as 'GL_1_1'.
+    """
+    name = getattr( module, '_EXTENSION_NAME', module )
+    if not isinstance( name, str ):
+        raise TypeError( """%r is not a GL module or extension name"""%( module, ))
+    match = VERSION_MODULE.match( name )
+    if match:
+        return '%s_VERSION_%s'%( match.group(1), name )
+    return name
+
 def _find_module( exclude = (__name__,)):
     frame = sys._getframe()
     while frame and '__name__' in frame.f_globals:
@@ -90,6 +105,8 @@ class BasePlatform( object ):
     DEFAULT_FUNCTION_TYPE = None
     GLUT_GUARD_CALLBACKS = False
     EXTENSIONS_USE_BASE_FUNCTIONS = False
+    # runtime error-checking default, see setErrorChecking
+    errorCheckingEnabled = True
     
     def install( self, namespace ):
         """Install this platform instance into the platform module"""
@@ -106,14 +123,78 @@ class BasePlatform( object ):
             return self.DEFAULT_FUNCTION_TYPE
     
     def errorChecking( self, func, dll, error_checker=None ):
-        """Add error checking to the function if appropriate"""
-        from OpenGL import error
+        """Add error checking to the function if appropriate
+
+        Functions given an error_checker are registered so that
+        setErrorChecking can add or remove the check later.
+        """
         if error_checker and _configflags.ERROR_CHECKING:
             #GLUT spec says error-checking is basically undefined...
             # there *may* be GL errors on GLUT calls that e.g. render 
             # geometry, but that's all basically "maybe" stuff...
-            func.errcheck = error_checker.glCheckError
+            self.errorCheckedFunctions.setdefault( func.__name__, [] ).append(
+                (func, error_checker)
+            )
+            if self.errorCheckingFor( func ):
+                func.errcheck = error_checker.glCheckError
         return func
+    @lazy_property
+    def errorCheckedFunctions( self ):
+        """function name: [(base function, error_checker)] for checkable functions"""
+        return {}
+    @lazy_property
+    def errorCheckingModules( self ):
+        """extension name: enabled, overriding errorCheckingEnabled"""
+        return {}
+    @lazy_property
+    def errorCheckingFunctions( self ):
+        """function name: enabled, overriding errorCheckingModules"""
+        return {}
+    def errorCheckingFor( self, func ):
+        """Whether the base function should currently check for errors"""
+        enabled = self.errorCheckingFunctions.get( func.__name__ )
+        if enabled is None:
+            enabled = self.errorCheckingModules.get( func.extension )
+            if enabled is None:
+                enabled = self.errorCheckingEnabled
+        return enabled
+    def setErrorChecking( self, enabled, modules=(), functions=() ):
+        """Enable or disable error checking at runtime
+
+        enabled -- whether the selected functions check for errors
+        modules -- GL modules (e.g. OpenGL.GL.VERSION.GL_1_1) or their
+            names ('GL_1_1', 'GL_ARB_vertex_buffer_object')
+        functions -- functions or function names ('glVertex3f')
+
+        With neither modules nor functions this sets the default for
+        everything and drops all per-module and per-function settings.
+        Per-function settings win over per-module ones, which win over
+        the default; they also apply to functions loaded later.
+
+        Disabling removes the check from the ctypes function, so a
+        disabled function costs nothing extra per call.  Checking can
+        only be re-enabled if ERROR_CHECKING was set at import.
+        """
+        from OpenGL import error
+        if enabled and not _configflags.ERROR_CHECKING:
+            raise error.Error(
+                """Error checking was disabled at import (ERROR_CHECKING), it cannot be enabled at runtime"""
+            )
+        enabled = bool( enabled )
+        if not (modules or functions):
+            self.errorCheckingEnabled = enabled
+            self.errorCheckingModules.clear()
+            self.errorCheckingFunctions.clear()
+        for module in modules:
+            self.errorCheckingModules[ _extensionName( module ) ] = enabled
+        for function in functions:
+            self.errorCheckingFunctions[ getattr( function, '__name__', function ) ] = enabled
+        for registered in self.errorCheckedFunctions.values():
+            for func, error_checker in registered:
+                if self.errorCheckingFor( func ):
+                    func.errcheck = error_checker.glCheckError
+                elif func.errcheck is not None:
+                    del func.errcheck
     def wrapContextCheck( self, func, dll ):
         """Wrap function with context-checking if appropriate"""
         if _configflags.CONTEXT_CHECKING and dll is self.GL and func.__name__ not in (
@@ -126,6 +207,9 @@ class BasePlatform( object ):
     def wrapLogging( self, func ):
         """Wrap function with logging operations if appropriate"""
         return logs.logOnFail( func, logs.getLog( 'OpenGL.errors' ))
+    def wrapProfiling( self, func ):
+        """Wrap function with call profiling if appropriate"""
+        return callprofile.profileCalls( func )
     
     def finalArgType( self, typ ):
         """Retrieve a final type for arg-type"""
@@ -181,10 +265,12 @@ class BasePlatform( object ):
         func.DLL = dll
         func.extension = extension
         func.deprecated = deprecated
-        func = self.wrapLogging( 
-            self.wrapContextCheck(
-                self.errorChecking( func, dll, error_checker=error_checker ),
-                dll,
+        func = self.wrapProfiling(
+            self.wrapLogging( 
+                self.wrapContextCheck(
+                    self.errorChecking( func, dll, error_checker=error_checker ),
+                    dll,
+                )
             )
         )
         if MODULE_ANNOTATIONS:
@@ -1,5 +1,5 @@
 """The wrapping code for providing natural ctypes-based OpenGL interface"""
-import ctypes, logging
+import ctypes, linecache, logging
 from OpenGL import platform, error
 assert platform
 from OpenGL._configflags import STORE_POINTERS, ERROR_ON_COPY, SIZE_1_ARRAY_UNPACK
@@ -42,6 +42,12 @@ def none_or_pass( incoming, function, arguments ):
     return incoming
 none_or_pass.optional=True
 
+def _tupleSource( names ):
+    """Source for a tuple display of the given expressions"""
+    if not names:
+        return '()'
+    return '(%s,)'%( ', '.join( names ), )
+
 class Wrapper( LateBind ):
     """Wrapper around a ctypes cFunction object providing SWIG-like hooks
 
@@ -409,989 +415,201 @@ class Wrapper( LateBind ):
         """Produce specialised versions of call for finalised wrapper object
 
         This returns a version of __call__ that only does that work which is
-        required by the particular wrapper object
+        required by the particular wrapper object.  With OpenGL_accelerate
+        that is the C-level Wrapper, otherwise generateCall() writes a
+        Python function for this particular set of converters.
+        """
+        if not cWrapper:
+            return self.generateCall()
+        pyConverters = getattr( self, 'pyConverters', None )
+        cConverters = getattr( self, 'cConverters', None )
+        cResolvers = getattr( self, 'cResolvers', None )
+        return cWrapper(
+            self.wrappedOperation,
+            calculate_pyArgs=PyArgCalculator(
+                self,pyConverters,
+            ) if pyConverters else None,
+            calculate_cArgs=CArgCalculator(
+                self, cConverters
+            ) if cConverters else None,
+            calculate_cArguments=CArgumentCalculator(
+                cResolvers
+            ) if cResolvers else None,
+            storeValues=getattr( self, 'storeValues', None ),
+            returnValues=getattr( self, 'returnValues', None ),
+        )
+    def generateCall( self ):
+        """Generate a straight-line Python call for the finalised wrapper
+
+        Each converter is bound into the namespace of the generated function
+        under its index (pyConverter0, cConverter1, cResolver2...) and called
+        on a local variable per argument, so a call does only the work this
+        wrapper needs: no generators, and the pyArgs/cArgs tuples are only
+        built when a converter, storeValues or returnValues takes them (or
+        an error is being annotated).  Default C converters which just pick
+        a Python argument are resolved to that argument's local.
 
-        This is essentially a huge set of expanded nested functions, very
-        inelegant...
+        The source is registered with linecache under "<wrapper NAME>" so
+        tracebacks through generated calls stay readable.
         """
         pyConverters = getattr( self, 'pyConverters', None )
         cConverters = getattr( self, 'cConverters', None )
         cResolvers = getattr( self, 'cResolvers', None )
-        wrappedOperation = self.wrappedOperation
         storeValues = getattr( self, 'storeValues', None )
         returnValues = getattr( self, 'returnValues', None )
+        wrappedOperation = self.wrappedOperation
+        namespace = {
+            'self': self,
+            'wrappedOperation': wrappedOperation,
+            'storeValues': storeValues,
+            'returnValues': returnValues,
+            'ctypes': ctypes,
+            'error': error,
+            'NULL': NULL,
+        }
+        body = []
+        add = body.append
+        # names holding the pyArgs, None meaning the incoming args tuple
+        pyNames = None
         if pyConverters:
-            if cWrapper:
-                calculate_pyArgs = PyArgCalculator(
-                    self,pyConverters,
+            required = len([p for p in pyConverters if not getattr( p, 'optional', False)])
+            def argumentCountError( args ):
+                return ValueError(
+                    """%s requires %r arguments (%s), received %s: %r"""%(
+                        wrappedOperation.__name__,
+                        required,
+                        ", ".join( self.pyConverterNames ),
+                        len(args),
+                        args
+                    )
                 )
-            else:
-                pyConverters_mapped = [
-                    (i,converter,(converter is None))
-                    for (i,converter) in enumerate( pyConverters )
-                ]
-                pyConverters_length = len([p for p in pyConverters if not getattr( p, 'optional', False)])
-                def calculate_pyArgs( args ):
-                    if pyConverters_length > len(args):
-                        raise ValueError(
-                            """%s requires %r arguments (%s), received %s: %r"""%(
-                                wrappedOperation.__name__,
-                                pyConverters_length,
-                                ", ".join( self.pyConverterNames ),
-                                len(args),
-                                args
-                            )
-                        )
-                    for index,converter,isNone in pyConverters_mapped:
-                        if isNone:
-                            yield args[index]
-                        else:
-                            try:
-                                yield converter(args[index], self, args)
-                            except IndexError as err:
-                                yield NULL
-                            except Exception as err:
-                                if hasattr( err, 'args' ):
-                                    err.args += ( converter, )
-                                raise
+            namespace['argumentCountError'] = argumentCountError
+            add( 'if %d > len(args):'%(required,) )
+            add( '    raise argumentCountError( args )' )
+            pyNames = []
+            for i,converter in enumerate( pyConverters ):
+                name = 'py%d'%(i,)
+                pyNames.append( name )
+                if converter is None:
+                    add( '%s = args[%d]'%(name,i) )
+                    continue
+                namespace['pyConverter%d'%(i,)] = converter
+                add( 'try:' )
+                add( '    %s = pyConverter%d( args[%d], self, args )'%(name,i,i) )
+                add( 'except IndexError:' )
+                add( '    %s = NULL'%(name,) )
+                add( 'except Exception as err:' )
+                add( '    if hasattr( err, "args" ):' )
+                add( '        err.args += ( pyConverter%d, )'%(i,) )
+                add( '    raise' )
+            pyArgs = _tupleSource( pyNames )
         else:
-            calculate_pyArgs = None
+            pyArgs = 'args'
+        # names holding the cArgs, None meaning "whatever pyArgs is"
+        cNames = pyNames
+        cSteps = []
+        needPyArgs = bool( storeValues or returnValues )
+        pyArgsName = 'args' if pyNames is None else 'pyArgs'
         if cConverters:
-            if cWrapper:
-                calculate_cArgs = CArgCalculator( self, cConverters )
-            else:
-                cConverters_mapped = [
-                    (i,converter,hasattr(converter,'__call__'))
-                    for (i,converter) in enumerate( cConverters )
-                ]
-                def calculate_cArgs( pyArgs ):
-                    for index,converter,canCall in cConverters_mapped:
-                        if canCall:
-                            try:
-                                yield converter( pyArgs, index, self )
-                            except Exception as err:
-                                if hasattr( err, 'args' ):
-                                    err.args += (
-                                        """Failure in cConverter %r"""%(converter),
-                                        pyArgs, index, self,
-                                    )
-                                raise
-                        else:
-                            yield converter
+            cNames = []
+            for i,converter in enumerate( cConverters ):
+                index = getattr( converter, 'index', None )
+                if (
+                    pyNames is not None and
+                    isinstance( converter, (DefaultCConverter,converters.getPyArgsName) ) and
+                    isinstance( index, int ) and 0 <= index < len(pyNames)
+                ):
+                    cNames.append( pyNames[index] )
+                elif hasattr( converter, '__call__' ):
+                    name = 'c%d'%(i,)
+                    cNames.append( name )
+                    namespace['cConverter%d'%(i,)] = converter
+                    needPyArgs = True
+                    cSteps.extend([
+                        'try:',
+                        '    %s = cConverter%d( %s, %d, self )'%(name,i,pyArgsName,i),
+                        'except Exception as err:',
+                        '    if hasattr( err, "args" ):',
+                        '        err.args += (',
+                        '            """Failure in cConverter %%r"""%%(cConverter%d),'%(i,),
+                        '            %s, %d, self,'%(pyArgsName,i),
+                        '        )',
+                        '    raise',
+                    ])
+                else:
+                    namespace['cConverter%d'%(i,)] = converter
+                    cNames.append( 'cConverter%d'%(i,) )
+        if needPyArgs and pyNames is not None:
+            add( 'pyArgs = %s'%(pyArgs,) )
+            pyArgs = 'pyArgs'
+        body.extend( cSteps )
+        if cNames is None:
+            cArgs = pyArgs
         else:
-            calculate_cArgs = None
+            cArgs = _tupleSource( cNames )
+            if (storeValues or returnValues) and cConverters:
+                add( 'cArgs = %s'%(cArgs,) )
+                cArgs = 'cArgs'
+            elif not cConverters:
+                cArgs = pyArgs
         if cResolvers:
-            if cWrapper:
-                calculate_cArguments = CArgumentCalculator( cResolvers )
-            else:
-                cResolvers_mapped = list(enumerate(cResolvers))
-                def calculate_cArguments( cArgs ):
-                    for i,converter in cResolvers_mapped:
-                        if converter is None:
-                            yield cArgs[i]
-                        else:
-                            try:
-                                yield converter( cArgs[i] )
-                            except Exception as err:
-                                err.args += (converter,)
-                                raise
-        else:
-            calculate_cArguments = None
-        if cWrapper:
-            return cWrapper(
-                wrappedOperation,
-                calculate_pyArgs=calculate_pyArgs,
-                calculate_cArgs=calculate_cArgs,
-                calculate_cArguments=calculate_cArguments,
-                storeValues=storeValues,
-                returnValues=returnValues,
-            )
-        if pyConverters:
-            if cConverters:
-                # create a map of index,converter, callable
-                if cResolvers:
-                    if storeValues:
-                        if returnValues:
-                            def wrapperCall( *args ):
-                                """Wrapper with all possible operations"""
-                                pyArgs = tuple( calculate_pyArgs( args ))
-                                cArgs = tuple(calculate_cArgs( pyArgs ))
-                                cArguments = tuple(calculate_cArguments( cArgs ))
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                # handle storage of persistent argument values...
-                                storeValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                                return returnValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                            return wrapperCall
-                        else:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save returnValues"""
-                                pyArgs = tuple( calculate_pyArgs( args ))
-                                cArgs = tuple(calculate_cArgs( pyArgs ))
-                                cArguments = tuple(calculate_cArguments( cArgs ))
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                # handle storage of persistent argument values...
-                                storeValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                                return result
-                            return wrapperCall
-                    else: # null storeValues
-                        if returnValues:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save storeValues"""
-                                pyArgs = tuple( calculate_pyArgs( args ))
-                                cArgs = tuple(calculate_cArgs( pyArgs ))
-                                cArguments = tuple(calculate_cArguments( cArgs ))
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                return returnValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                            return wrapperCall
-                        else:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save returnValues and storeValues"""
-                                pyArgs = tuple( calculate_pyArgs( args ))
-                                cArgs = tuple(calculate_cArgs( pyArgs ))
-                                cArguments = tuple(calculate_cArguments( cArgs ))
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                return result
-                            return wrapperCall
+            cArgumentNames = []
+            for i,resolver in enumerate( cResolvers ):
+                if cNames is not None and i < len(cNames):
+                    source = cNames[i]
                 else:
-                    # null cResolvers
-                    if storeValues:
-                        if returnValues:
-                            def wrapperCall( *args ):
-                                """Wrapper with all possible operations"""
-                                pyArgs = tuple( calculate_pyArgs( args ))
-                                cArgs = tuple(calculate_cArgs( pyArgs ))
-                                cArguments = cArgs
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                # handle storage of persistent argument values...
-                                storeValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                                return returnValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                            return wrapperCall
-                        else:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save returnValues"""
-                                pyArgs = tuple( calculate_pyArgs( args ))
-                                cArgs = tuple(calculate_cArgs( pyArgs ))
-                                cArguments = cArgs
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                # handle storage of persistent argument values...
-                                storeValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                                return result
-                            return wrapperCall
-                    else: # null storeValues
-                        if returnValues:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save storeValues"""
-                                pyArgs = tuple( calculate_pyArgs( args ))
-                                cArgs = tuple(calculate_cArgs( pyArgs ))
-                                cArguments = cArgs
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                return returnValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                            return wrapperCall
-                        else:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save returnValues and storeValues"""
-                                pyArgs = tuple( calculate_pyArgs( args ))
-                                cArgs = tuple(calculate_cArgs( pyArgs ))
-                                cArguments = cArgs
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                return result
-                            return wrapperCall
-            else:
-                # null cConverters
-                if cResolvers:
-                    if storeValues:
-                        if returnValues:
-                            def wrapperCall( *args ):
-                                """Wrapper with all possible operations"""
-                                pyArgs = tuple( calculate_pyArgs( args ))
-                                cArgs = pyArgs
-                                cArguments = tuple(calculate_cArguments( cArgs ))
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                # handle storage of persistent argument values...
-                                storeValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                                return returnValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                            return wrapperCall
-                        else:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save returnValues"""
-                                pyArgs = tuple( calculate_pyArgs( args ))
-                                cArgs = pyArgs
-                                cArguments = tuple(calculate_cArguments( cArgs ))
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                # handle storage of persistent argument values...
-                                storeValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                                return result
-                            return wrapperCall
-                    else: # null storeValues
-                        if returnValues:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save storeValues"""
-                                pyArgs = tuple( calculate_pyArgs( args ))
-                                cArgs = pyArgs
-                                cArguments = tuple(calculate_cArguments( cArgs ))
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                return returnValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                            return wrapperCall
-                        else:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save returnValues and storeValues"""
-                                pyArgs = tuple( calculate_pyArgs( args ))
-                                cArgs = pyArgs
-                                cArguments = tuple(calculate_cArguments( cArgs ))
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                return result
-                            return wrapperCall
-                else:
-                    # null cResolvers
-                    if storeValues:
-                        if returnValues:
-                            def wrapperCall( *args ):
-                                """Wrapper with all possible operations"""
-                                pyArgs = tuple( calculate_pyArgs( args ))
-                                cArguments = pyArgs
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArguments
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                # handle storage of persistent argument values...
-                                storeValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArguments,
-                                )
-                                return returnValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArguments,
-                                )
-                            return wrapperCall
-                        else:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save returnValues"""
-                                pyArgs = tuple( calculate_pyArgs( args ))
-                                cArguments = pyArgs
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArguments
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                # handle storage of persistent argument values...
-                                storeValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArguments,
-                                )
-                                return result
-                            return wrapperCall
-                    else: # null storeValues
-                        if returnValues:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save storeValues"""
-                                pyArgs = tuple( calculate_pyArgs( args ))
-                                cArguments = pyArgs
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArguments
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                return returnValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArguments,
-                                )
-                            return wrapperCall
-                        else:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save returnValues and storeValues"""
-                                pyArgs = tuple( calculate_pyArgs( args ))
-                                cArguments = pyArgs
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArguments
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                return result
-                            return wrapperCall
+                    source = '%s[%d]'%(cArgs,i)
+                if resolver is None:
+                    cArgumentNames.append( source )
+                    continue
+                name = 'r%d'%(i,)
+                cArgumentNames.append( name )
+                namespace['cResolver%d'%(i,)] = resolver
+                add( 'try:' )
+                add( '    %s = cResolver%d( %s )'%(name,i,source) )
+                add( 'except Exception as err:' )
+                add( '    err.args += ( cResolver%d, )'%(i,) )
+                add( '    raise' )
+            cArguments = _tupleSource( cArgumentNames )
+            call = 'wrappedOperation( %s )'%( ', '.join( cArgumentNames ), )
+        elif cNames is not None:
+            cArguments = cArgs
+            call = 'wrappedOperation( %s )'%( ', '.join( cNames ), )
         else:
-            # null pyConverters
-            if cConverters:
-                if cResolvers:
-                    if storeValues:
-                        if returnValues:
-                            def wrapperCall( *args ):
-                                """Wrapper with all possible operations"""
-                                pyArgs = args
-                                cArgs = []
-                                for (index,converter) in enumerate( cConverters ):
-                                    # move enumerate out...
-                                    if not hasattr(converter,'__call__'):
-                                        cArgs.append( converter )
-                                    else:
-                                        try:
-                                            cArgs.append(
-                                                converter( pyArgs, index, self )
-                                            )
-                                        except Exception as err:
-                                            if hasattr( err, 'args' ):
-                                                err.args += (
-                                                    """Failure in cConverter %r"""%(converter),
-                                                    pyArgs, index,
-                                                )
-                                            raise
-                                cArguments = tuple(calculate_cArguments( cArgs ))
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                # handle storage of persistent argument values...
-                                storeValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                                return returnValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                            return wrapperCall
-                        else:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save returnValues"""
-                                pyArgs = args
-                                cArgs = []
-                                for (index,converter) in enumerate( cConverters ):
-                                    # move enumerate out...
-                                    if not hasattr(converter,'__call__'):
-                                        cArgs.append( converter )
-                                    else:
-                                        try:
-                                            cArgs.append(
-                                                converter( pyArgs, index, self )
-                                            )
-                                        except Exception as err:
-                                            if hasattr( err, 'args' ):
-                                                err.args += (
-                                                    """Failure in cConverter %r"""%(converter),
-                                                    pyArgs, index,
-                                                )
-                                            raise
-                                cArguments = tuple(calculate_cArguments( cArgs ))
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                # handle storage of persistent argument values...
-                                storeValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                                return result
-                            return wrapperCall
-                    else: # null storeValues
-                        if returnValues:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save storeValues"""
-                                pyArgs = args
-                                cArgs = []
-                                for (index,converter) in enumerate( cConverters ):
-                                    # move enumerate out...
-                                    if not hasattr(converter,'__call__'):
-                                        cArgs.append( converter )
-                                    else:
-                                        try:
-                                            cArgs.append(
-                                                converter( pyArgs, index, self )
-                                            )
-                                        except Exception as err:
-                                            if hasattr( err, 'args' ):
-                                                err.args += (
-                                                    """Failure in cConverter %r"""%(converter),
-                                                    pyArgs, index,
-                                                )
-                                            raise
-                                cArguments = tuple(calculate_cArguments( cArgs ))
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                return returnValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                            return wrapperCall
-                        else:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save returnValues and storeValues"""
-                                pyArgs = args
-                                cArgs = []
-                                for (index,converter) in enumerate( cConverters ):
-                                    # move enumerate out...
-                                    if not hasattr(converter,'__call__'):
-                                        cArgs.append( converter )
-                                    else:
-                                        try:
-                                            cArgs.append(
-                                                converter( pyArgs, index, self )
-                                            )
-                                        except Exception as err:
-                                            if hasattr( err, 'args' ):
-                                                err.args += (
-                                                    """Failure in cConverter %r"""%(converter),
-                                                    pyArgs, index,
-                                                )
-                                            raise
-                                cArguments = tuple(calculate_cArguments( cArgs ))
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                return result
-                            return wrapperCall
-                else:
-                    # null cResolvers
-                    if storeValues:
-                        if returnValues:
-                            def wrapperCall( *args ):
-                                """Wrapper with all possible operations"""
-                                pyArgs = args
-                                cArgs = []
-                                for (index,converter) in enumerate( cConverters ):
-                                    # move enumerate out...
-                                    if not hasattr(converter,'__call__'):
-                                        cArgs.append( converter )
-                                    else:
-                                        try:
-                                            cArgs.append(
-                                                converter( pyArgs, index, self )
-                                            )
-                                        except Exception as err:
-                                            if hasattr( err, 'args' ):
-                                                err.args += (
-                                                    """Failure in cConverter %r"""%(converter),
-                                                    pyArgs, index,
-                                                )
-                                            raise
-                                cArguments = cArgs
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                # handle storage of persistent argument values...
-                                storeValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                                return returnValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                            return wrapperCall
-                        else:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save returnValues"""
-                                pyArgs = args
-                                cArgs = []
-                                for (index,converter) in enumerate( cConverters ):
-                                    # move enumerate out...
-                                    if not hasattr(converter,'__call__'):
-                                        cArgs.append( converter )
-                                    else:
-                                        try:
-                                            cArgs.append(
-                                                converter( pyArgs, index, self )
-                                            )
-                                        except Exception as err:
-                                            if hasattr( err, 'args' ):
-                                                err.args += (
-                                                    """Failure in cConverter %r"""%(converter),
-                                                    pyArgs, index,
-                                                )
-                                            raise
-                                cArguments = cArgs
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                # handle storage of persistent argument values...
-                                storeValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                                return result
-                            return wrapperCall
-                    else: # null storeValues
-                        if returnValues:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save storeValues"""
-                                pyArgs = args
-                                cArgs = []
-                                for (index,converter) in enumerate( cConverters ):
-                                    # move enumerate out...
-                                    if not hasattr(converter,'__call__'):
-                                        cArgs.append( converter )
-                                    else:
-                                        try:
-                                            cArgs.append(
-                                                converter( pyArgs, index, self )
-                                            )
-                                        except Exception as err:
-                                            if hasattr( err, 'args' ):
-                                                err.args += (
-                                                    """Failure in cConverter %r"""%(converter),
-                                                    pyArgs, index,
-                                                )
-                                            raise
-                                cArguments = cArgs
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                return returnValues(
-                                    result,
-                                    self,
-                                    pyArgs,
-                                    cArgs,
-                                )
-                            return wrapperCall
-                        else:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save returnValues and storeValues"""
-                                pyArgs = args
-                                cArgs = []
-                                for (index,converter) in enumerate( cConverters ):
-                                    # move enumerate out...
-                                    if not hasattr(converter,'__call__'):
-                                        cArgs.append( converter )
-                                    else:
-                                        try:
-                                            cArgs.append(
-                                                converter( pyArgs, index, self )
-                                            )
-                                        except Exception as err:
-                                            if hasattr( err, 'args' ):
-                                                err.args += (
-                                                    """Failure in cConverter %r"""%(converter),
-                                                    pyArgs, index,
-                                                )
-                                            raise
-                                cArguments = cArgs
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = pyArgs
-                                    raise err
-                                return result
-                            return wrapperCall
-            else:
-                # null cConverters
-                if cResolvers:
-                    if storeValues:
-                        if returnValues:
-                            def wrapperCall( *args ):
-                                """Wrapper with all possible operations"""
-                                cArgs = args
-                                cArguments = tuple(calculate_cArguments( cArgs ))
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = args
-                                    raise err
-                                # handle storage of persistent argument values...
-                                storeValues(
-                                    result,
-                                    self,
-                                    args,
-                                    cArgs,
-                                )
-                                return returnValues(
-                                    result,
-                                    self,
-                                    args,
-                                    cArgs,
-                                )
-                            return wrapperCall
-                        else:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save returnValues"""
-                                cArgs = args
-                                cArguments = tuple(calculate_cArguments( cArgs ))
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = args
-                                    raise err
-                                # handle storage of persistent argument values...
-                                storeValues(
-                                    result,
-                                    self,
-                                    args,
-                                    cArgs,
-                                )
-                                return result
-                            return wrapperCall
-                    else: # null storeValues
-                        if returnValues:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save storeValues"""
-                                cArgs = args
-                                cArguments = tuple(calculate_cArguments( cArgs ))
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = args
-                                    raise err
-                                return returnValues(
-                                    result,
-                                    self,
-                                    args,
-                                    cArgs,
-                                )
-                            return wrapperCall
-                        else:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save returnValues and storeValues"""
-                                cArgs = args
-                                cArguments = tuple(calculate_cArguments( cArgs ))
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArgs
-                                    err.pyArgs = args
-                                    raise err
-                                return result
-                            return wrapperCall
-                else:
-                    # null cResolvers
-                    if storeValues:
-                        if returnValues:
-                            def wrapperCall( *args ):
-                                """Wrapper with all possible operations"""
-                                cArguments = args
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArguments
-                                    err.pyArgs = args
-                                    raise err
-                                # handle storage of persistent argument values...
-                                storeValues(
-                                    result,
-                                    self,
-                                    args,
-                                    cArguments,
-                                )
-                                return returnValues(
-                                    result,
-                                    self,
-                                    args,
-                                    cArguments,
-                                )
-                            return wrapperCall
-                        else:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save returnValues"""
-                                cArguments = args
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArguments
-                                    err.pyArgs = args
-                                    raise err
-                                # handle storage of persistent argument values...
-                                storeValues(
-                                    result,
-                                    self,
-                                    args,
-                                    cArguments,
-                                )
-                                return result
-                            return wrapperCall
-                    else: # null storeValues
-                        if returnValues:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save storeValues"""
-                                cArguments = args
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArguments
-                                    err.pyArgs = args
-                                    raise err
-                                return returnValues(
-                                    result,
-                                    self,
-                                    args,
-                                    cArguments,
-                                )
-                            return wrapperCall
-                        else:
-                            def wrapperCall( *args ):
-                                """Wrapper with all save returnValues and storeValues"""
-                                cArguments = args
-                                try:
-                                    result = wrappedOperation( *cArguments )
-                                except ctypes.ArgumentError as err:
-                                    err.args = err.args + (cArguments,)
-                                    raise err
-                                except error.GLError as err:
-                                    err.cArgs = cArguments
-                                    err.pyArgs = args
-                                    raise err
-                                return result
-                            return wrapperCall
+            cArguments = 'args'
+            call = 'wrappedOperation( *args )'
+        add( 'try:' )
+        if storeValues or returnValues:
+            add( '    result = %s'%(call,) )
+        else:
+            add( '    return %s'%(call,) )
+        add( 'except ctypes.ArgumentError as err:' )
+        add( '    err.args = err.args + (%s,)'%(cArguments,) )
+        add( '    raise err' )
+        add( 'except error.GLError as err:' )
+        add( '    err.cArgs = %s'%(cArgs,) )
+        add( '    err.pyArgs = %s'%(pyArgs,) )
+        add( '    raise err' )
+        if storeValues:
+            add( '# handle storage of persistent argument values...' )
+            add( 'storeValues( result, self, %s, %s )'%(pyArgs,cArgs) )
+        if returnValues:
+            add( 'return returnValues( result, self, %s, %s )'%(pyArgs,cArgs) )
+        elif storeValues:
+            add( 'return result' )
+        name = getattr( wrappedOperation, '__name__', 'wrapper' )
+        filename = '<wrapper %s>'%(name,)
+        source = '\n'.join(
+            ['def wrapperCall( *args ):']+
+            ['    '+line for line in body]
+        ) + '\n'
+        exec( compile( source, filename, 'exec' ), namespace )
+        linecache.cache[ filename ] = (
+            len(source), None, source.splitlines( True ), filename,
+        )
+        wrapperCall = namespace['wrapperCall']
+        wrapperCall.__name__ = wrapperCall.__qualname__ = name
+        return wrapperCall
 #    def __call__( self, *args, **named ):
 #        """Finalise the wrapper before calling it"""
 #        try:
@@ -1508,6 +726,7 @@ def wrapper( wrappedOperation ):
     dict = {
         '__doc__': wrappedOperation.__doc__,
         '__slots__': ('wrappedOperation', ),
+        'bindFinalCall': True,
     }
     cls = type( wrappedOperation.__name__, (Wrapper,), dict )
     if hasattr( wrappedOperation, '__module__' ):
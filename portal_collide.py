@@ -0,0 +1,246 @@
+"""Static colliders and a bounding volume hierarchy for the portal game.
+
+A Colliders set holds boxes (wall tiles and trigger slabs), axis-aligned
+rectangles with an optional rectangular hole (laser walls) and vertical
+cylinders (buttons). Each collider carries the caller's kind tag and the
+index of the level object it came from. After build(), a whole packet of
+bullet segments, or a point such as the player position, is answered by one
+walk down a BVH, so adding level content deepens the tree instead of adding
+loops. Hits come back ordered by collider, that is in the order the groups
+were added, which lets callers give one kind of collider priority over
+another.
+"""
+import numpy as np
+
+# Collider shapes
+BOX = 0  # Closed axis-aligned box
+RECT = 1  # Axis-aligned rectangle in the plane where coordinate axis equals value, minus an optional hole
+CYLINDER = 2  # Vertical cylinder open at the bottom; answers point queries only
+LEAF_SIZE = 8  # Colliders per BVH leaf
+BOUNDS_MARGIN = 1e-6  # BVH bounds are padded so rounding in the exact tests never loses a hit
+PARALLEL_EPSILON = 1e-6  # Segments moving less than this along an axis count as parallel to it
+
+def _spread_bits(v):
+    """Spread the low 10 bits of v so two zero bits follow each one."""
+    v = (v | (v << 16)) & 0x030000FF
+    v = (v | (v << 8)) & 0x0300F00F
+    v = (v | (v << 4)) & 0x030C30C3
+    v = (v | (v << 2)) & 0x09249249
+    return v
+
+def morton_codes(points):
+    """Return 30-bit Morton codes for points, quantized over their bounding box."""
+    lo = points.min(axis=0)
+    span = points.max(axis=0) - lo
+    span[span == 0] = 1.0
+    cells = ((points - lo) / span * 1023).astype(np.int64)
+    return (_spread_bits(cells[:, 0]) << 2) | (_spread_bits(cells[:, 1]) << 1) | _spread_bits(cells[:, 2])
+
+def boxes_overlap(a_min, a_max, b_min, b_max):
+    """Vectorized closed-box overlap test over rows."""
+    return ((a_min <= b_max) & (a_max >= b_min)).all(axis=1)
+
+def segment_box_hits(start, end, box_min, box_max):
+    """Vectorized slab test of segments against boxes, row by row.
+
+    Returns (hit, t): hit masks the segments that touch their box, t is where
+    they enter it as a fraction of the segment (0 when they start inside).
+    """
+    direction = end - start
+    parallel = np.abs(direction) < PARALLEL_EPSILON
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ood = 1.0 / direction
+        t1 = (box_min - start) * ood
+        t2 = (box_max - start) * ood
+    t_enter = np.where(parallel, 0.0, np.minimum(t1, t2)).max(axis=1, initial=0.0)
+    t_exit = np.where(parallel, 1.0, np.maximum(t1, t2)).min(axis=1, initial=1.0)
+    outside = (parallel & ((start < box_min) | (start > box_max))).any(axis=1)
+    return ~outside & (t_enter <= t_exit), t_enter
+
+def segment_rect_hits(start, end, axis, value, rect_min, rect_max, hole_min, hole_max):
+    """Vectorized segment test against axis-aligned rectangles with holes, row by row.
+
+    Returns (hit, t) with t the crossing point as a fraction of the segment.
+    """
+    rows = np.arange(len(start))
+    delta = end[rows, axis] - start[rows, axis]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (value - start[rows, axis]) / delta
+    hit = (np.abs(delta) >= PARALLEL_EPSILON) & (t >= 0) & (t <= 1)
+    # The in-plane axes: v is Y for vertical planes
+    u = np.where(axis == 0, 2, 0)
+    v = np.where(axis == 1, 2, 1)
+    pu = start[rows, u] + t * (end[rows, u] - start[rows, u])
+    pv = start[rows, v] + t * (end[rows, v] - start[rows, v])
+    hit &= ((rect_min[rows, u] <= pu) & (pu <= rect_max[rows, u]) &
+            (rect_min[rows, v] <= pv) & (pv <= rect_max[rows, v]))
+    hit &= ~((hole_min[rows, u] <= pu) & (pu <= hole_max[rows, u]) &
+             (hole_min[rows, v] <= pv) & (pv <= hole_max[rows, v]))
+    return hit, t
+
+class BVH:
+    """Implicit bounding volume hierarchy over boxes.
+
+    Boxes are sorted along a Morton curve through their centers and packed
+    leaf_size to a leaf. The leaves are the bottom row of a complete binary
+    tree whose node bounds are kept one array per level, root first, so a
+    query walks a whole packet of boxes down the tree with numpy, level by
+    level, and never visits a subtree its boxes do not overlap.
+    """
+    def __init__(self, box_min, box_max, leaf_size=LEAF_SIZE):
+        n = len(box_min)
+        if n:
+            # Unbounded sides (open cylinders) do not count towards the center
+            lo = np.where(np.isfinite(box_min), box_min, box_max)
+            hi = np.where(np.isfinite(box_max), box_max, box_min)
+            order = np.argsort(morton_codes(np.nan_to_num((lo + hi) / 2)), kind='stable')
+        else:
+            order = np.zeros(0, dtype=np.int64)
+        self.depth = int(max(-(-n // leaf_size), 1) - 1).bit_length()
+        width = 2 ** self.depth
+        items = np.full(width * leaf_size, -1, dtype=np.int64)
+        items[:n] = order
+        self.leaf_items = items.reshape(width, leaf_size)  # Collider indices per leaf, -1 for empty slots
+        lo = np.full((width * leaf_size, 3), np.inf)
+        hi = np.full((width * leaf_size, 3), -np.inf)
+        lo[:n] = box_min[order]
+        hi[:n] = box_max[order]
+        self.item_min = box_min
+        self.item_max = box_max
+        lo = lo.reshape(width, leaf_size, 3).min(axis=1)
+        hi = hi.reshape(width, leaf_size, 3).max(axis=1)
+        self.level_min = [lo]
+        self.level_max = [hi]
+        while len(lo) > 1:
+            lo = np.minimum(lo[0::2], lo[1::2])
+            hi = np.maximum(hi[0::2], hi[1::2])
+            self.level_min.insert(0, lo)
+            self.level_max.insert(0, hi)
+
+    def query(self, query_min, query_max):
+        """Return (query, item) index arrays pairing each query box with the boxes it overlaps."""
+        query = np.arange(len(query_min))
+        node = np.zeros(len(query_min), dtype=np.int64)
+        for level in range(self.depth + 1):
+            keep = boxes_overlap(self.level_min[level][node], self.level_max[level][node],
+                                 query_min[query], query_max[query])
+            query = query[keep]
+            node = node[keep]
+            if level < self.depth:
+                query = np.repeat(query, 2)
+                node = (2 * node[:, None] + np.array([0, 1])).ravel()
+        items = self.leaf_items[node].ravel()
+        query = np.repeat(query, self.leaf_items.shape[1])
+        valid = items >= 0
+        query = query[valid]
+        items = items[valid]
+        keep = boxes_overlap(self.item_min[items], self.item_max[items], query_min[query], query_max[query])
+        return query[keep], items[keep]
+
+class Colliders:
+    """A static set of tagged colliders; add groups, build() once, then query."""
+    def __init__(self):
+        self._groups = []
+        self.bvh = None
+
+    def _add(self, kind, shape, box_min, box_max, **params):
+        box_min = np.asarray(box_min, dtype=float).reshape(-1, 3)
+        box_max = np.asarray(box_max, dtype=float).reshape(-1, 3)
+        self._groups.append((kind, shape, box_min, box_max, params))
+
+    def add_boxes(self, kind, box_min, box_max):
+        """Add closed boxes, one per row of box_min/box_max."""
+        self._add(kind, BOX, box_min, box_max)
+
+    def add_rects(self, kind, axis, value, rect_min, rect_max, hole_min, hole_max):
+        """Add rectangles in the planes where coordinate axis equals value.
+
+        rect_min/rect_max bound each rectangle (only the in-plane axes are
+        used); hole_min/hole_max cut a hole out of it, an empty box for none.
+        """
+        axis = np.asarray(axis, dtype=np.int64).reshape(-1)
+        value = np.asarray(value, dtype=float).reshape(-1)
+        rect_min = np.array(rect_min, dtype=float).reshape(-1, 3)
+        rect_max = np.array(rect_max, dtype=float).reshape(-1, 3)
+        rows = np.arange(len(axis))
+        rect_min[rows, axis] = value
+        rect_max[rows, axis] = value
+        self._add(kind, RECT, rect_min, rect_max, axis=axis, value=value,
+                  hole_min=np.asarray(hole_min, dtype=float).reshape(-1, 3),
+                  hole_max=np.asarray(hole_max, dtype=float).reshape(-1, 3))
+
+    def add_cylinders(self, kind, center, radius, top):
+        """Add vertical cylinders around center[x, z], reaching from below the floor up to top."""
+        center = np.asarray(center, dtype=float).reshape(-1, 3)
+        radius = np.asarray(radius, dtype=float).reshape(-1)
+        top = np.asarray(top, dtype=float).reshape(-1)
+        box_min = np.stack([center[:, 0] - radius, np.full(len(top), -np.inf), center[:, 2] - radius], axis=1)
+        box_max = np.stack([center[:, 0] + radius, top, center[:, 2] + radius], axis=1)
+        self._add(kind, CYLINDER, box_min, box_max, center=center, radius=radius, top=top)
+
+    def build(self, leaf_size=LEAF_SIZE):
+        """Concatenate the added groups into flat per-collider arrays and build the BVH over them."""
+        counts = [len(group[2]) for group in self._groups]
+        n = sum(counts)
+        self.count = n
+        self.kind = np.concatenate([np.full(c, group[0], dtype=np.int64) for c, group in zip(counts, self._groups)]
+                                   + [np.zeros(0, dtype=np.int64)])
+        self.owner = np.concatenate([np.arange(c) for c in counts] + [np.zeros(0, dtype=np.int64)])
+        self.shape = np.concatenate([np.full(c, group[1], dtype=np.int64) for c, group in zip(counts, self._groups)]
+                                    + [np.zeros(0, dtype=np.int64)])
+        self.min = np.concatenate([group[2] for group in self._groups] + [np.zeros((0, 3))])
+        self.max = np.concatenate([group[3] for group in self._groups] + [np.zeros((0, 3))])
+        # Shape parameters, stored for every collider and only meaningful for its own shape
+        self.axis = np.zeros(n, dtype=np.int64)
+        self.value = np.zeros(n)
+        self.hole_min = np.ones((n, 3))
+        self.hole_max = np.zeros((n, 3))
+        self.center = np.zeros((n, 3))
+        self.radius = np.zeros(n)
+        self.top = np.zeros(n)
+        first = 0
+        for c, (_, _, _, _, params) in zip(counts, self._groups):
+            for name, values in params.items():
+                getattr(self, name)[first:first + c] = values
+            first += c
+        self.bvh = BVH(self.min - BOUNDS_MARGIN, self.max + BOUNDS_MARGIN, leaf_size)
+        return self
+
+    def segment_hits(self, start, end):
+        """Sweep a packet of segments (n, 3) through the box and rectangle colliders.
+
+        Returns (segment, collider, t) arrays for every hit, ordered by segment
+        and then collider; t is where the segment meets the collider as a
+        fraction of its length.
+        """
+        segment, collider = self.bvh.query(np.minimum(start, end), np.maximum(start, end))
+        hit = np.zeros(len(collider), dtype=bool)
+        t = np.zeros(len(collider))
+        shape = self.shape[collider]
+        box = np.flatnonzero(shape == BOX)
+        if len(box):
+            s, c = segment[box], collider[box]
+            hit[box], t[box] = segment_box_hits(start[s], end[s], self.min[c], self.max[c])
+        rect = np.flatnonzero(shape == RECT)
+        if len(rect):
+            s, c = segment[rect], collider[rect]
+            hit[rect], t[rect] = segment_rect_hits(start[s], end[s], self.axis[c], self.value[c], self.min[c],
+                                                   self.max[c], self.hole_min[c], self.hole_max[c])
+        segment, collider, t = segment[hit], collider[hit], t[hit]
+        order = np.lexsort((collider, segment))
+        return segment[order], collider[order], t[order]
+
+    def point_hits(self, point):
+        """Return the indices of the colliders containing point, in collider order."""
+        point = np.asarray(point, dtype=float).reshape(1, 3)
+        _, collider = self.bvh.query(point, point)
+        collider = np.sort(collider)
+        p = point[0]
+        shape = self.shape[collider]
+        inside = (self.min[collider] <= p).all(axis=1) & (p <= self.max[collider]).all(axis=1)
+        dx = p[0] - self.center[collider, 0]
+        dz = p[2] - self.center[collider, 2]
+        in_cylinder = (np.sqrt(dx**2 + dz**2) <= self.radius[collider]) & (p[1] <= self.top[collider])
+        rect = shape == RECT
+        in_rect = inside & ~((self.hole_min[collider] <= p) & (p <= self.hole_max[collider])).all(axis=1)
+        return collider[np.where(shape == CYLINDER, in_cylinder, np.where(rect, in_rect, inside))]
@@ -0,0 +1,198 @@
+"""Vectorized runner that steps many window-less portal games in lockstep.
+
+VectorEnv spreads N GameState instances over a pool of worker processes.
+Actions and observations live in shared memory, so a lockstep step only
+sends one short command per worker down its pipe. Solvers and fuzzers
+write one action row per environment, call step() and read back the
+batched observation array.
+"""
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from portal_sim import GameState, Inputs
+
+# Action row layout, one float per Inputs field
+ACTION_FIELDS = ('forward', 'strafe', 'yaw', 'pitch', 'fire_blue', 'fire_yellow', 'reset', 'clear_portals')
+ACTION_SIZE = len(ACTION_FIELDS)
+# Observation row layout; portal entries hold the tile index, or -1 when the portal is not placed
+OBS_FIELDS = ('x', 'y', 'z', 'yaw', 'pitch', 'blue_portal', 'yellow_portal', 'door_open', 'won')
+OBS_SIZE = len(OBS_FIELDS)
+
+def inputs_from_action(row):
+    """Build an Inputs record from one action row."""
+    return Inputs(forward=row[0], strafe=row[1], yaw=row[2], pitch=row[3],
+                  fire_blue=row[4] > 0.5, fire_yellow=row[5] > 0.5,
+                  reset=row[6] > 0.5, clear_portals=row[7] > 0.5)
+
+def observe(game, out):
+    """Write the observation of game into out, a row of OBS_SIZE floats."""
+    out[0:3] = game.player_pos
+    out[3] = game.player_yaw
+    out[4] = game.player_pitch
+    blue = game.portal('blue')
+    yellow = game.portal('yellow')
+    out[5] = -1 if blue is None else blue['tile']
+    out[6] = -1 if yellow is None else yellow['tile']
+    out[7] = game.button_activated
+    out[8] = game.game_won
+
+class EnvSlice:
+    """A contiguous block of environments stepped by one process."""
+    def __init__(self, start, stop, actions, observations, dt):
+        self.start = start
+        self.stop = stop
+        self.actions = actions
+        self.observations = observations
+        self.dt = dt
+        self.games = [GameState() for _ in range(start, stop)]
+
+    def reset(self):
+        for i, game in enumerate(self.games, self.start):
+            game.reset_game()
+            observe(game, self.observations[i])
+
+    def step(self, substeps):
+        for i, game in enumerate(self.games, self.start):
+            game.step(self.dt, inputs_from_action(self.actions[i]))
+            for _ in range(substeps - 1):
+                game.step(self.dt)
+            observe(game, self.observations[i])
+
+def _attach(name, shape):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+def _worker(conn, num_envs, start, stop, action_name, obs_name, dt):
+    action_shm, actions = _attach(action_name, (num_envs, ACTION_SIZE))
+    obs_shm, observations = _attach(obs_name, (num_envs, OBS_SIZE))
+    envs = EnvSlice(start, stop, actions, observations, dt)
+    try:
+        while True:
+            command, arg = conn.recv()
+            if command == 'step':
+                envs.step(arg)
+            elif command == 'reset':
+                envs.reset()
+            elif command == 'close':
+                break
+            conn.send(None)
+    finally:
+        del actions, observations, envs
+        action_shm.close()
+        obs_shm.close()
+        conn.close()
+
+class VectorEnv:
+    """N independent portal games stepped in lockstep across worker processes.
+
+    actions is a (num_envs, ACTION_SIZE) array the caller fills before each
+    step(); observations is the (num_envs, OBS_SIZE) array step() and reset()
+    refresh. With num_workers=0 all environments run in the calling process.
+    """
+    def __init__(self, num_envs, num_workers=None, dt=0.016):
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        num_workers = max(0, min(num_workers, num_envs))
+        self.num_envs = num_envs
+        self._action_shm = shared_memory.SharedMemory(create=True, size=num_envs * ACTION_SIZE * 8)
+        self._obs_shm = shared_memory.SharedMemory(create=True, size=num_envs * OBS_SIZE * 8)
+        self.actions = np.ndarray((num_envs, ACTION_SIZE), dtype=np.float64, buffer=self._action_shm.buf)
+        self.observations = np.ndarray((num_envs, OBS_SIZE), dtype=np.float64, buffer=self._obs_shm.buf)
+        self.actions[:] = 0.0
+        self._local = None
+        self._pipes = []
+        self._processes = []
+        if num_workers == 0:
+            self._local = EnvSlice(0, num_envs, self.actions, self.observations, dt)
+        else:
+            bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                parent, child = multiprocessing.Pipe()
+                process = multiprocessing.Process(
+                    target=_worker,
+                    args=(child, num_envs, int(start), int(stop), self._action_shm.name, self._obs_shm.name, dt),
+                    daemon=True,
+                )
+                process.start()
+                child.close()
+                self._pipes.append(parent)
+                self._processes.append(process)
+        self.reset()
+
+    def _broadcast(self, command, arg=None):
+        for pipe in self._pipes:
+            pipe.send((command, arg))
+        for pipe in self._pipes:
+            pipe.recv()
+
+    def reset(self):
+        """Reset every game and return the observations array."""
+        if self._local is not None:
+            self._local.reset()
+        else:
+            self._broadcast('reset')
+        self.actions[:] = 0.0
+        return self.observations
+
+    def step(self, actions=None, substeps=1):
+        """Apply one action row per game, advance all games by substeps ticks and return the observations.
+
+        The action applies to the first tick only; the remaining substeps run without input.
+        """
+        if actions is not None:
+            self.actions[:] = actions
+        if self._local is not None:
+            self._local.step(substeps)
+        else:
+            self._broadcast('step', substeps)
+        return self.observations
+
+    def close(self):
+        for pipe in self._pipes:
+            try:
+                pipe.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join()
+        for pipe in self._pipes:
+            pipe.close()
+        self._pipes = []
+        self._processes = []
+        del self.actions, self.observations
+        self._local = None
+        self._action_shm.close()
+        self._action_shm.unlink()
+        self._obs_shm.close()
+        self._obs_shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+def main():
+    """Fuzz the puzzle with random actions and report lockstep throughput."""
+    num_envs = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    num_steps = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    rng = np.random.default_rng(0)
+    with VectorEnv(num_envs) as env:
+        start = time.perf_counter()
+        for _ in range(num_steps):
+            actions = np.zeros((num_envs, ACTION_SIZE))
+            actions[:, 0:2] = rng.uniform(-1.0, 1.0, (num_envs, 2))
+            actions[:, 2] = rng.normal(0.0, 5.0, num_envs)
+            actions[:, 4:6] = rng.random((num_envs, 2)) < 0.01
+            observations = env.step(actions)
+        elapsed = time.perf_counter() - start
+        print(f"{num_envs} envs x {num_steps} steps in {elapsed:.2f}s: "
+              f"{num_envs * num_steps / elapsed:.0f} env-steps/s, "
+              f"{int(observations[:, 7].sum())} doors open, {int(observations[:, 8].sum())} wins")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Micro-benchmarks for the PyOpenGL call path the portal game leans on.
+
+Times the per-call cost of a few GL entry points as the game calls them
+(glVertex3fv, glColor3f, glGetFloatv...). Without --window no GL context is
+made current, so on GLX/EGL the calls land in the dispatch library's no-op
+stubs and the numbers are the Python-side cost of a call alone. For
+late-bound wrappers the "trampoline" column calls through LateBind.__call__,
+the dispatch every call paid before finalised wrappers bound their final
+call as their class's __call__:
+
+    python portal_glbench.py [--window] [CALLS]
+"""
+import functools
+import sys
+import time
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.latebind import LateBind
+
+DEFAULT_CALLS = 20000  # Calls per round
+ROUNDS = 5
+VERTEX = (1.0, 2.0, 3.0)
+VERTEX_ARRAY = np.array(VERTEX, 'f')
+
+def cases():
+    """Return [(name, function, args)] for the calls to time."""
+    return [
+        ('glVertex3f', glVertex3f, VERTEX),
+        ('glVertex3fv(tuple)', glVertex3fv, (VERTEX,)),
+        ('glVertex3fv(array)', glVertex3fv, (VERTEX_ARRAY,)),
+        ('glColor3f', glColor3f, VERTEX),
+        ('glGetFloatv', glGetFloatv, (GL_MODELVIEW_MATRIX,)),
+        ('glGetIntegerv', glGetIntegerv, (GL_VIEWPORT,)),
+    ]
+
+def time_call(function, args, calls):
+    """Return the mean cost of function(*args) in nanoseconds, best of ROUNDS runs."""
+    function(*args)
+    best = float('inf')
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best / calls * 1e9
+
+def open_window():
+    """Make a GL context current through a small hidden GLUT window."""
+    from OpenGL.GLUT import glutInit, glutInitWindowSize, glutCreateWindow, glutHideWindow
+    glutInit(sys.argv[:1])
+    glutInitWindowSize(64, 64)
+    glutCreateWindow(b"portal_glbench")
+    glutHideWindow()
+
+def main():
+    args = sys.argv[1:]
+    if '--window' in args:
+        args.remove('--window')
+        open_window()
+    calls = int(args[0]) if args else DEFAULT_CALLS
+    print(f"{'call':<20} {'ns/call':>9} {'trampoline':>11}")
+    for name, function, call_args in cases():
+        line = f"{name:<20} {time_call(function, call_args, calls):9.0f}"
+        if isinstance(function, LateBind):
+            trampoline = time_call(functools.partial(LateBind.__call__, function), call_args, calls)
+            line += f" {trampoline:11.0f}"
+        print(line)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
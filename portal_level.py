@@ -0,0 +1,230 @@
+"""Level description and binary level files for the portal game.
+
+A level is a handful of numpy structured arrays: walls, the tiles they are
+split into, laser planes (optionally with a rectangular hole), buttons and
+doors, plus an info record with the room bounds and spawn point. build()
+turns authored walls into tiles with vectorized numpy; save() writes the
+arrays back to back behind a small header, and load() memory-maps them, so
+a level of any size loads without constructing Python objects per tile.
+
+    python portal_level.py room.lvl      # write the built-in room
+"""
+import hashlib
+import struct
+import sys
+import time
+import numpy as np
+
+MAGIC = b'PRTLLVL1'
+HEADER = struct.Struct('<8s5I')  # Magic, then wall, tile, laser, button and door counts
+ALIGN = 8  # Sections start on 8-byte boundaries
+
+INFO_DTYPE = np.dtype([
+    ('room_min', '<f8', (3,)),  # Bullets outside the room box skip collision checks
+    ('room_max', '<f8', (3,)),
+    ('player_min', '<f8', (3,)),  # Player position clamp (x and z)
+    ('player_max', '<f8', (3,)),
+    ('spawn', '<f8', (3,)),
+    ('spawn_yaw', '<f8'),
+])
+WALL_DTYPE = np.dtype([
+    ('start', '<f8', (2,)),  # (x, z) of the first column edge
+    ('end', '<f8', (2,)),  # (x, z) of the last column edge
+    ('height', '<f8'),
+    ('rows', '<i4'),
+    ('cols', '<i4'),
+    ('normal', '<f8', (3,)),  # Unit normal pointing into the room; portal exits step out along it
+    ('exit_yaw', '<f8'),  # Player yaw after leaving a portal on this wall, NaN to keep the current yaw
+])
+TILE_DTYPE = np.dtype([
+    ('quad', '<f8', (4, 3)),  # Corners in drawing order
+    ('min', '<f8', (3,)),
+    ('max', '<f8', (3,)),
+    ('wall', '<i4'),
+    ('door', '<i4'),  # Index of the door the tile belongs to, or -1
+])
+LASER_DTYPE = np.dtype([
+    ('axis', '<i4'),  # The plane is where coordinate axis equals value
+    ('guarded', '<i4'),  # 1 for door lasers, switched off once the door opens
+    ('value', '<f8'),
+    ('min', '<f8', (3,)),  # Extent of the wall; only the two in-plane axes are used
+    ('max', '<f8', (3,)),
+    ('hole_min', '<f8', (3,)),  # Hole in the wall; an empty box (min > max) means no hole
+    ('hole_max', '<f8', (3,)),
+    ('trigger_min', '<f8', (3,)),  # Player positions inside this box touch the laser
+    ('trigger_max', '<f8', (3,)),
+])
+BUTTON_DTYPE = np.dtype([
+    ('pos', '<f8', (3,)),  # Center of the lower face
+    ('radius', '<f8'),
+    ('height', '<f8'),
+])
+DOOR_DTYPE = np.dtype([
+    ('wall', '<i4'),
+    ('cols', '<i4', (2,)),  # Half-open column range of the door tiles on the wall
+    ('rows', '<i4', (2,)),  # Half-open row range
+    ('trigger_min', '<f8', (3,)),  # Player positions inside this box walk through the door
+    ('trigger_max', '<f8', (3,)),
+])
+NO_HOLE = ((1.0, 1.0, 1.0), (0.0, 0.0, 0.0))
+SECTIONS = (('walls', WALL_DTYPE), ('tiles', TILE_DTYPE), ('lasers', LASER_DTYPE),
+            ('buttons', BUTTON_DTYPE), ('doors', DOOR_DTYPE))
+
+class Level:
+    """A level's info record and its wall, tile, laser, button and door arrays.
+
+    All buttons share one switch: stepping on any of them opens every door
+    and turns off every guarded laser.
+    """
+    def __init__(self, info, walls, tiles, lasers, buttons, doors, path=None):
+        self.info = info
+        self.walls = walls
+        self.tiles = tiles
+        self.lasers = lasers
+        self.buttons = buttons
+        self.doors = doors
+        self.path = path  # File the level was loaded from, None for a built level
+
+def wall_tiles(walls):
+    """Split walls into row-major grids of tiles.
+
+    Returns (tiles, row, col): a TILE_DTYPE array with door = -1, plus each tile's row and column on its wall.
+    """
+    rows = walls['rows'].astype(np.int64)
+    cols = walls['cols'].astype(np.int64)
+    counts = rows * cols
+    wall = np.repeat(np.arange(len(walls)), counts)
+    first = np.repeat(np.cumsum(counts) - counts, counts)
+    local = np.arange(counts.sum()) - first
+    row = local // cols[wall]
+    col = local % cols[wall]
+    x1, z1 = walls['start'][wall].T
+    x2, z2 = walls['end'][wall].T
+    dx = (x2 - x1) / cols[wall]
+    dz = (z2 - z1) / cols[wall]
+    dy = walls['height'][wall] / rows[wall]
+    y_bottom = row * dy
+    y_top = (row + 1) * dy
+    x_left = x1 + col * dx
+    z_left = z1 + col * dz
+    x_right = x1 + (col + 1) * dx
+    z_right = z1 + (col + 1) * dz
+    tiles = np.zeros(len(wall), dtype=TILE_DTYPE)
+    tiles['quad'] = np.stack([
+        np.stack([x_left, y_bottom, z_left], axis=1),
+        np.stack([x_right, y_bottom, z_right], axis=1),
+        np.stack([x_right, y_top, z_right], axis=1),
+        np.stack([x_left, y_top, z_left], axis=1),
+    ], axis=1)
+    tiles['min'] = tiles['quad'].min(axis=1)
+    tiles['max'] = tiles['quad'].max(axis=1)
+    tiles['wall'] = wall
+    tiles['door'] = -1
+    return tiles, row, col
+
+def build(info, walls, lasers=(), buttons=(), doors=()):
+    """Assemble a Level from authored records, generating and door-flagging its tiles.
+
+    Each argument is a sequence of tuples in the field order of the matching
+    dtype (info is a single tuple).
+    """
+    info = np.array(tuple(info), dtype=INFO_DTYPE)
+    walls = np.array(list(walls), dtype=WALL_DTYPE)
+    lasers = np.array(list(lasers), dtype=LASER_DTYPE)
+    buttons = np.array(list(buttons), dtype=BUTTON_DTYPE)
+    doors = np.array(list(doors), dtype=DOOR_DTYPE)
+    tiles, row, col = wall_tiles(walls)
+    for index, door in enumerate(doors):
+        inside = ((tiles['wall'] == door['wall']) &
+                  (door['cols'][0] <= col) & (col < door['cols'][1]) &
+                  (door['rows'][0] <= row) & (row < door['rows'][1]))
+        tiles['door'][inside] = index
+    return Level(info, walls, tiles, lasers, buttons, doors)
+
+def default_level():
+    """Return the built-in room: a 20 x 20 x 9 box with a door, a button and three laser walls."""
+    room_size = 20.0
+    height = 9.0
+    info = ((0.0, 0.0, 0.0), (room_size, height, room_size), (0.1, 0.0, 0.1), (19.9, 0.0, 19.9),
+            (10.0, 0.0, 10.0), 0.0)
+    walls = [
+        ((0, 0), (room_size, 0), height, 3, 12, (0.0, 0.0, 1.0), 180),
+        ((room_size, 0), (room_size, room_size), height, 3, 12, (-1.0, 0.0, 0.0), -90),
+        ((room_size, room_size), (0, room_size), height, 3, 12, (0.0, 0.0, -1.0), 0),
+        ((0, room_size), (0, 0), height, 3, 12, (1.0, 0.0, 0.0), 90),
+    ]
+    lasers = [
+        # Door laser across the room at Z=15, off once the button is pressed
+        (2, 1, 15.0, (0.0, 0.0, 15.0), (20.0, 9.0, 15.0)) + NO_HOLE +
+        ((0.0 - 0.5, 0.0 - 0.5, 14.5), (20.0 + 0.5, 9.0 + 0.5, 15.5)),
+        # Button enclosure: Z=8.5 wall with a hole at X=4-5, Y=2-3, and the X=9 wall
+        (2, 0, 8.5, (0.0, 0.0, 8.5), (9.0, 9.0, 8.5), (4.0, 2.0, 8.5), (5.0, 3.0, 8.5),
+         (0.0, 0.0 - 0.5, 8.0), (9.0, 9.0 + 0.5, 9.0)),
+        (0, 0, 9.0, (9.0, 0.0, 0.0), (9.0, 9.0, 8.5)) + NO_HOLE +
+        ((8.5, 0.0 - 0.5, 0.0), (9.5, 9.0 + 0.5, 8.5)),
+    ]
+    buttons = [((2.0, 0.0, 2.0), 2.0, 0.833)]
+    # Door: front wall tiles at X=6.67-15, rows 0-1; walked through at X=6.67-13.33, Y=0-6, Z=19.9-20.1
+    doors = [(2, (3, 8), (0, 2), (6.67 - 0.5, 0.0 - 0.5, 19.9), (13.33 + 0.5, 6.0 + 0.5, 20.1))]
+    return build(info, walls, lasers, buttons, doors)
+
+def _aligned(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+def _file_arrays(level):
+    """Return level's info record and section arrays as they are laid out in a level file."""
+    arrays = [np.ascontiguousarray(getattr(level, name), dtype=dtype) for name, dtype in SECTIONS]
+    return [np.asarray(level.info, dtype=INFO_DTYPE).reshape(1)] + arrays
+
+def level_digest(level):
+    """Return a sha256 digest of level's contents, the same for a built level and its saved file."""
+    digest = hashlib.sha256()
+    for array in _file_arrays(level):
+        digest.update(struct.pack('<I', len(array)))
+        digest.update(array.tobytes())
+    return digest.digest()
+
+def save(level, path):
+    """Write level to path in the binary level format."""
+    info, *arrays = _file_arrays(level)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, *(len(array) for array in arrays)))
+        offset = _aligned(HEADER.size)
+        f.write(b'\0' * (offset - HEADER.size))
+        for array in [info] + arrays:
+            data = array.tobytes()
+            f.write(data)
+            end = _aligned(offset + len(data))
+            f.write(b'\0' * (end - offset - len(data)))
+            offset = end
+
+def load(path):
+    """Memory-map a level file; the returned arrays are read-only views of the file."""
+    with open(path, 'rb') as f:
+        magic, *counts = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a portal level")
+    data = np.memmap(path, dtype=np.uint8, mode='r')
+    offset = _aligned(HEADER.size)
+    arrays = []
+    for dtype, count in zip((INFO_DTYPE,) + tuple(dtype for _, dtype in SECTIONS), [1] + counts):
+        arrays.append(np.frombuffer(data, dtype=dtype, count=count, offset=offset))
+        offset = _aligned(offset + dtype.itemsize * count)
+    info = arrays[0][0]
+    return Level(info, *arrays[1:], path=path)
+
+def main():
+    """Write the built-in room to a level file and time loading it back."""
+    if len(sys.argv) < 2:
+        print(f"usage: {sys.argv[0]} OUTPUT")
+        return 2
+    save(default_level(), sys.argv[1])
+    start = time.perf_counter()
+    level = load(sys.argv[1])
+    elapsed = time.perf_counter() - start
+    print(f"{sys.argv[1]}: {len(level.walls)} walls, {len(level.tiles)} tiles, {len(level.lasers)} lasers, "
+          f"{len(level.buttons)} buttons, {len(level.doors)} doors, loaded in {elapsed * 1e3:.2f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Leveled, rate-limited logging for the portal game.
+
+Game modules log through get_logger() with %-style arguments, so a message
+below the configured level is dropped before anything is formatted. Records
+that pass the level check are rate limited per call site and kept in an
+in-memory ring buffer; nothing reaches stdout until flush() is called.
+Until configure() runs only warnings and errors are reported, on stderr.
+"""
+import collections
+import logging
+import os
+import sys
+import time
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+# Defaults, overridable through the environment
+DEFAULT_LEVEL = os.environ.get('PORTAL_LOG_LEVEL', 'INFO')
+DEFAULT_CAPACITY = 2000  # Records kept in the ring buffer
+DEFAULT_INTERVAL = 1.0  # Seconds between records from the same call site
+LOG_FORMAT = '%(relativeCreated)10.1f %(levelname)-7s %(name)s: %(message)s'
+
+_root = logging.getLogger('portal')
+_handler = None  # RingBufferHandler installed by configure()
+
+class RateLimitFilter(logging.Filter):
+    """Pass at most one record per call site every interval seconds.
+
+    The next record let through from a throttled site notes how many were dropped.
+    """
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        super().__init__()
+        self.interval = interval
+        self.sites = {}  # (pathname, lineno) -> [last emit time, suppressed count]
+
+    def filter(self, record):
+        if self.interval <= 0.0:
+            return True
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        entry = self.sites.get(site)
+        if entry is None:
+            self.sites[site] = [now, 0]
+            return True
+        if now - entry[0] < self.interval:
+            entry[1] += 1
+            return False
+        if entry[1]:
+            record.msg = f"{record.msg} [{entry[1]} similar suppressed]"
+        entry[0] = now
+        entry[1] = 0
+        return True
+
+class RingBufferHandler(logging.Handler):
+    """Keep the latest records in memory; flush() formats and writes them out."""
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        super().__init__()
+        self.records = collections.deque(maxlen=capacity)
+
+    def emit(self, record):
+        # Arguments are often live game state (player_pos); render them before they change
+        record.msg = record.getMessage()
+        record.args = None
+        self.records.append(record)
+
+    def flush(self, stream=None):
+        """Write the buffered records to stream (stdout by default) and empty the buffer."""
+        if stream is None:
+            stream = sys.stdout
+        self.acquire()
+        try:
+            records = list(self.records)
+            self.records.clear()
+        finally:
+            self.release()
+        for record in records:
+            stream.write(self.format(record) + '\n')
+        stream.flush()
+
+def get_logger(name):
+    """Return the game logger for a module, e.g. get_logger('sim') -> 'portal.sim'."""
+    return _root.getChild(name)
+
+def configure(level=DEFAULT_LEVEL, capacity=DEFAULT_CAPACITY, interval=DEFAULT_INTERVAL):
+    """Route game logging at level and above into a fresh ring buffer."""
+    global _handler
+    if _handler is not None:
+        _root.removeHandler(_handler)
+    _handler = RingBufferHandler(capacity)
+    _handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    _handler.addFilter(RateLimitFilter(interval))
+    _root.addHandler(_handler)
+    _root.setLevel(level)
+    _root.propagate = False
+    return _handler
+
+def set_level(level):
+    """Change the game log level at runtime."""
+    _root.setLevel(level)
+
+def flush(stream=None):
+    """Write out and empty the ring buffer; does nothing before configure()."""
+    if _handler is not None:
+        _handler.flush(stream)
@@ -0,0 +1,141 @@
+"""Per-phase frame profiling for the portal game.
+
+A Profiler times named phases, written as `with profiler.phase('tiles'):`
+blocks, and keeps the latest samples of each phase in a rolling window;
+report() turns them into p50/p95/p99 timings. After count_gl_calls() has
+wrapped the GL functions of a module, every phase also records how many GL
+calls it issued. dump() writes the report as CSV or JSON. A disabled
+profiler hands out one shared no-op context, so instrumented code costs
+next to nothing when profiling is off.
+"""
+import collections
+import contextlib
+import csv
+import json
+import re
+import time
+import numpy as np
+
+DEFAULT_WINDOW = 600  # Samples kept per phase, about ten seconds of frames
+PERCENTILES = (50, 95, 99)
+GL_FUNCTION = re.compile(r'^(gl|glu|glut)[A-Z]')  # Names count_gl_calls wraps
+REPORT_FIELDS = ('phase', 'samples', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'gl_calls')
+
+_NULL_PHASE = contextlib.nullcontext()
+
+class _Phase:
+    """Context manager timing one run of a phase."""
+    __slots__ = ('profiler', 'name', 'start', 'calls')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.calls = self.profiler.gl_calls
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.profiler.record(self.name, elapsed, self.profiler.gl_calls - self.calls)
+        return False
+
+class _CountedFunction:
+    """Wrapper counting calls to a GL function in a Profiler.
+
+    Truth tests go to the wrapped function, so `bool(glFoo)` still tells
+    whether the context provides the entry point.
+    """
+    __slots__ = ('profiler', '__wrapped__', '__name__')
+
+    def __init__(self, profiler, function):
+        self.profiler = profiler
+        self.__wrapped__ = function
+        self.__name__ = getattr(function, '__name__', 'counted')
+
+    def __call__(self, *args, **kwargs):
+        self.profiler.gl_calls += 1
+        return self.__wrapped__(*args, **kwargs)
+
+    def __bool__(self):
+        return bool(self.__wrapped__)
+
+    def __getattr__(self, name):
+        return getattr(self.__wrapped__, name)
+
+class Profiler:
+    """Rolling per-phase timings and GL call counts."""
+    def __init__(self, window=DEFAULT_WINDOW, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self.times = {}  # Phase name -> deque of durations in seconds, in first-seen phase order
+        self.calls = {}  # Phase name -> deque of GL call counts, matching times
+        self.gl_calls = 0  # GL calls issued so far through count_gl_calls wrappers
+        self.counting = False  # count_gl_calls has run
+
+    def phase(self, name):
+        """Return a context manager that records one sample of phase name."""
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def record(self, name, seconds, calls=0):
+        times = self.times.get(name)
+        if times is None:
+            times = self.times[name] = collections.deque(maxlen=self.window)
+            self.calls[name] = collections.deque(maxlen=self.window)
+        times.append(seconds)
+        self.calls[name].append(calls)
+
+    def reset(self):
+        self.times.clear()
+        self.calls.clear()
+
+    def count_gl_calls(self, namespace):
+        """Wrap the gl*, glu* and glut* functions in namespace (a module's globals) to count calls.
+
+        Only calls looked up through namespace are counted; display lists and
+        VBO helpers issue GL calls the wrappers do not see.
+        """
+        for name, function in list(namespace.items()):
+            if GL_FUNCTION.match(name) and callable(function) and not isinstance(function, type):
+                namespace[name] = self._counted(function)
+        self.counting = True
+
+    def _counted(self, function):
+        return _CountedFunction(self, function)
+
+    def report(self):
+        """Return one dict per phase with its sample count, mean and percentile times in ms and mean GL calls."""
+        rows = []
+        for name, times in self.times.items():
+            ms = np.array(times) * 1e3
+            p50, p95, p99 = np.percentile(ms, PERCENTILES)
+            rows.append({'phase': name, 'samples': len(ms), 'mean_ms': float(ms.mean()),
+                         'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99),
+                         'gl_calls': float(np.mean(self.calls[name]))})
+        return rows
+
+    def format(self):
+        """Return the report as aligned text lines for an overlay or a log."""
+        lines = [f"{'phase':<21} {'p50':>7} {'p95':>7} {'p99':>7} ms" + ('   calls' if self.counting else '')]
+        for row in self.report():
+            line = f"{row['phase']:<21} {row['p50_ms']:7.2f} {row['p95_ms']:7.2f} {row['p99_ms']:7.2f}"
+            if self.counting:
+                line += f" {row['gl_calls']:7.1f}"
+            lines.append(line)
+        return lines
+
+    def dump(self, path):
+        """Write the report to path: JSON when it ends in .json, CSV otherwise."""
+        rows = self.report()
+        with open(path, 'w', newline='') as f:
+            if path.endswith('.json'):
+                json.dump({'window': self.window, 'gl_calls_counted': self.counting, 'phases': rows}, f, indent=2)
+            else:
+                writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+
+DISABLED = Profiler(enabled=False)  # Default for code that is profiled only when someone asks
@@ -0,0 +1,211 @@
+"""Input recording and deterministic replay for the portal game.
+
+A recording is a short header naming the level it was made on, by path and
+by a digest of its contents, followed by fixed-size event records. Each
+event is stamped with the simulation tick it was applied before, so feeding
+the log back through GameState.step reproduces a session bit for bit,
+bullets, teleports and wins included. The recorder closes the log with an
+END record and a digest of the final game state, which replays check
+against; a replay loads the recorded level and refuses one whose contents
+differ. Run this module on a recording to replay it headless, as fast as
+the simulation allows, optionally naming the level file if it has moved:
+
+    python portal_replay.py session.rec [room.lvl]
+"""
+import hashlib
+import os
+import struct
+import sys
+import time
+import numpy as np
+import portal_level
+import portal_log
+from portal_sim import GameState, BULLET_COLORS
+
+log = portal_log.get_logger('replay')
+
+MAGIC = b'PRTLREC2'
+HEADER = struct.Struct('<8sd32sH')  # Magic, simulation step in seconds, level digest, level path size
+# The UTF-8 level path follows the header, empty for the built-in room
+OLD_MAGIC = b'PRTLREC1'  # Recordings that did not name their level, read as made in the built-in room
+OLD_HEADER = struct.Struct('<8sd')  # Magic, simulation step in seconds
+EVENT = struct.Struct('<IBdd')  # Tick, event kind, two arguments
+DIGEST_SIZE = 32  # sha256 of the final state, after the END record
+# Event kinds
+MOVE = 1  # a=forward, b=strafe
+TURN = 2  # a=yaw, b=pitch
+FIRE = 3  # a=bullet color id
+RESET = 4  # Restart the level
+CLEAR = 5  # Clear bullets and portals
+END = 6  # Last tick of the recording
+
+def apply_event(game, kind, a=0.0, b=0.0):
+    """Apply one input event to game."""
+    if kind == MOVE:
+        game.move_player(a, b)
+    elif kind == TURN:
+        game.turn(a, b)
+    elif kind == FIRE:
+        game.fire(BULLET_COLORS[int(a)])
+    elif kind == RESET:
+        game.reset_game()
+    elif kind == CLEAR:
+        game.reset_bullets()
+
+def state_digest(game):
+    """Return a sha256 digest of everything the simulation carries between ticks."""
+    digest = hashlib.sha256()
+    digest.update(np.array(list(game.player_pos) + [game.player_yaw, game.player_pitch, game.v_y,
+                                                    game.time, game.last_teleport_time]).tobytes())
+    bullets = game.bullets
+    n = bullets.count
+    for array in (bullets.pos, bullets.prev_pos, bullets.velocity, bullets.time_alive, bullets.color):
+        digest.update(np.ascontiguousarray(array[:n]).tobytes())
+    flags = (game.is_falling, game.blue_shot_fired, game.yellow_shot_fired, game.door_color,
+             game.button_activated, game.game_won, list(game.tile_colors))
+    digest.update(repr(flags).encode())
+    return digest.digest()
+
+class Recorder:
+    """Write input events to a recording file as they are applied, for a game playing level."""
+    def __init__(self, path, dt, level):
+        self.path = path
+        level_path = os.path.abspath(level.path).encode() if level.path else b''
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, dt, portal_level.level_digest(level), len(level_path)))
+        self.file.write(level_path)
+
+    def record(self, tick, kind, a=0.0, b=0.0):
+        self.file.write(EVENT.pack(tick, kind, a, b))
+
+    def close(self, tick, game):
+        """Finish the log at tick with the digest of game's current state."""
+        if self.file.closed:
+            return
+        self.file.write(EVENT.pack(tick, END, 0.0, 0.0))
+        self.file.write(state_digest(game))
+        self.file.close()
+        log.info("Recorded %d ticks to %s", tick, self.path)
+
+class Recording:
+    """A loaded recording: step size, level, events, last tick and expected final digest."""
+    def __init__(self, dt, level_path, level_digest, events, end_tick, digest):
+        self.dt = dt
+        self.level_path = level_path  # Empty for the built-in room
+        self.level_digest = level_digest  # portal_level.level_digest of the level played
+        self.events = events  # [(tick, kind, a, b)] in recording order
+        self.end_tick = end_tick
+        self.digest = digest  # None when the recording was cut short
+
+def load(path):
+    """Read a recording file."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic = data[:len(MAGIC)]
+    if magic == MAGIC:
+        _, dt, level_digest, path_size = HEADER.unpack_from(data)
+        offset = HEADER.size + path_size
+        level_path = data[HEADER.size:offset].decode()
+    elif magic == OLD_MAGIC:
+        _, dt = OLD_HEADER.unpack_from(data)
+        offset = OLD_HEADER.size
+        level_path = ''
+        level_digest = portal_level.level_digest(portal_level.default_level())
+    else:
+        raise ValueError(f"{path} is not a portal recording")
+    events = []
+    end_tick = None
+    digest = None
+    while offset + EVENT.size <= len(data):
+        tick, kind, a, b = EVENT.unpack_from(data, offset)
+        offset += EVENT.size
+        if kind == END:
+            end_tick = tick
+            if offset + DIGEST_SIZE <= len(data):
+                digest = data[offset:offset + DIGEST_SIZE]
+            break
+        events.append((tick, kind, a, b))
+    if end_tick is None:
+        end_tick = events[-1][0] if events else 0
+    return Recording(dt, level_path, level_digest, events, end_tick, digest)
+
+def recorded_level(recording, path=None):
+    """Load the level recording was made on, from path if given, else from the recorded path.
+
+    Raises ValueError if the level's contents differ from the recorded ones.
+    """
+    path = path or recording.level_path
+    level = portal_level.load(path) if path else portal_level.default_level()
+    if portal_level.level_digest(level) != recording.level_digest:
+        raise ValueError(f"{path or 'the built-in room'} is not the level the recording was made on")
+    return level
+
+class Player:
+    """Feed a recording into a GameState, one fixed simulation tick at a time.
+
+    A game on another level than the recorded one is switched to it, see recorded_level().
+    """
+    def __init__(self, recording, game, level_path=None):
+        self.recording = recording
+        self.game = game
+        if portal_level.level_digest(game.level) != recording.level_digest:
+            game.load_level(recorded_level(recording, level_path))
+        self.tick = 0
+        self._next = 0  # Index of the first event not yet applied
+
+    @property
+    def done(self):
+        return self.tick >= self.recording.end_tick
+
+    def apply_due(self):
+        """Apply the events stamped with the current tick."""
+        events = self.recording.events
+        while self._next < len(events) and events[self._next][0] <= self.tick:
+            _, kind, a, b = events[self._next]
+            apply_event(self.game, kind, a, b)
+            self._next += 1
+
+    def step(self):
+        """Apply this tick's events, then advance the game by one step."""
+        self.apply_due()
+        self.game.step(self.recording.dt)
+        self.tick += 1
+        if self.done:
+            self.apply_due()
+
+    def matches(self):
+        """Return whether the game ended in the recorded state, or None if the recording has no digest."""
+        if self.recording.digest is None:
+            return None
+        return state_digest(self.game) == self.recording.digest
+
+def replay(recording, game=None, level_path=None):
+    """Run a recording headless to its last tick and return the Player."""
+    player = Player(recording, game if game is not None else GameState(), level_path)
+    if player.done:
+        player.apply_due()
+    while not player.done:
+        player.step()
+    return player
+
+def main():
+    """Replay a recording headless and report speed and whether the final state matched."""
+    if len(sys.argv) < 2:
+        print(f"usage: {sys.argv[0]} RECORDING [LEVEL]")
+        return 2
+    recording = load(sys.argv[1])
+    start = time.perf_counter()
+    try:
+        player = replay(recording, level_path=sys.argv[2] if len(sys.argv) > 2 else None)
+    except (OSError, ValueError) as err:
+        print(f"Cannot replay {sys.argv[1]}: {err}")
+        return 1
+    elapsed = time.perf_counter() - start
+    game_time = player.tick * recording.dt
+    print(f"{player.tick} ticks ({game_time:.1f}s of play) in {elapsed:.2f}s, "
+          f"{game_time / max(elapsed, 1e-9):.1f}x real time")
+    print(f"won={player.game.game_won} digest={state_digest(player.game).hex()[:16]} matches={player.matches()}")
+    return 0 if player.matches() is not False else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,484 @@
+"""Window-less simulation core for the portal game.
+
+GameState owns the player, bullets, wall tiles, button and door state and
+advances them with step(dt, inputs). Nothing in this module touches OpenGL,
+so it can run batch playthroughs without a window; the GLUT front-end in
+"Final Project.py" only renders a GameState.
+"""
+import math
+import numpy as np
+import portal_collide
+import portal_level
+import portal_log
+import portal_profile
+
+log = portal_log.get_logger('sim')
+
+# Player settings
+PLAYER_SPEED = 8.0  # Units per second at full movement input
+# Collider kinds, in the order they are added to the collider sets
+LASER = 0
+TILE = 1
+DOOR = 2
+BUTTON = 3
+# Bullet settings
+BULLET_BLUE = 0
+BULLET_YELLOW = 1
+BULLET_COLORS = ['blue', 'yellow']  # Color name per bullet color id
+BULLET_SPEED = 7.0
+BULLET_LIFETIME = 5.0
+BULLET_RADIUS = 0.1
+# Teleportation cooldown
+TELEPORT_COOLDOWN = 1.0  # Seconds
+# Physics settings
+GRAVITY = -20.0  # Gravity acceleration
+
+class BulletPool:
+    """Structure-of-arrays store for bullets, kept contiguous and in firing order."""
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.pos = np.zeros((capacity, 3))  # [x, y, z] per bullet
+        self.prev_pos = np.zeros((capacity, 3))  # Position before the latest update, for collision and interpolation
+        self.velocity = np.zeros((capacity, 3))  # Scaled direction per bullet
+        self.time_alive = np.zeros(capacity)
+        self.color = np.zeros(capacity, dtype=np.int8)  # BULLET_BLUE or BULLET_YELLOW
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self):
+        capacity = 2 * len(self.time_alive)
+        for name in ('pos', 'prev_pos', 'velocity', 'time_alive', 'color', 'alive'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def spawn(self, pos, direction, color):
+        """Add a bullet at pos moving along direction; color is 'blue' or 'yellow'."""
+        if self.count == len(self.time_alive):
+            self._grow()
+        i = self.count
+        self.pos[i] = pos
+        self.prev_pos[i] = pos
+        self.velocity[i] = direction
+        self.velocity[i] *= BULLET_SPEED
+        self.time_alive[i] = 0.0
+        self.color[i] = BULLET_COLORS.index(color)
+        self.alive[i] = True
+        self.count += 1
+
+    def clear(self):
+        self.count = 0
+
+    def compact(self):
+        """Drop bullets whose alive flag is cleared, preserving firing order."""
+        keep = np.flatnonzero(self.alive[:self.count])
+        n = len(keep)
+        if n == self.count:
+            return
+        self.pos[:n] = self.pos[keep]
+        self.prev_pos[:n] = self.prev_pos[keep]
+        self.velocity[:n] = self.velocity[keep]
+        self.time_alive[:n] = self.time_alive[keep]
+        self.color[:n] = self.color[keep]
+        self.alive[:n] = True
+        self.count = n
+
+class Inputs:
+    """Player commands consumed by one GameState.step."""
+    def __init__(self, forward=0.0, strafe=0.0, yaw=0.0, pitch=0.0,
+                 fire_blue=False, fire_yellow=False, reset=False, clear_portals=False):
+        self.forward = forward  # Movement axis in [-1, 1], scaled by PLAYER_SPEED * dt
+        self.strafe = strafe  # Positive strafes right
+        self.yaw = yaw  # Degrees to turn right this step
+        self.pitch = pitch  # Degrees to look up this step
+        self.fire_blue = fire_blue
+        self.fire_yellow = fire_yellow
+        self.reset = reset
+        self.clear_portals = clear_portals
+
+def plane_axes(axis):
+    """Return the (u, v) axes spanning the plane perpendicular to axis; v is Y for vertical planes."""
+    return {0: (2, 1), 1: (0, 2), 2: (0, 1)}[axis]
+
+def look_direction(yaw, pitch):
+    """Return the unit view vector for a yaw/pitch pair in degrees."""
+    lx = math.sin(math.radians(yaw)) * math.cos(math.radians(pitch))
+    ly = math.sin(math.radians(pitch))
+    lz = -math.cos(math.radians(yaw)) * math.cos(math.radians(pitch))
+    return [lx, ly, lz]
+
+class GameState:
+    """Player, bullets, tiles, button and door state, plus the rules that advance them."""
+    def __init__(self, level=None):
+        self.changed_tiles = set()  # Tiles recolored since the renderer last synced, for mesh patching
+        # Portal registry: tile index -> portal entry for every tile of each color, kept current by
+        # set_tile_color/reset_tile_colors; two same-color bullets landing in one step paint two tiles
+        self.portals = {'blue': {}, 'yellow': {}}
+        self.bullets = BulletPool()
+        self.time = 0.0  # Simulation clock in seconds, advanced by step
+        self.profiler = portal_profile.DISABLED  # Times the phases of step when replaced by an enabled Profiler
+        self.load_level(level if level is not None else portal_level.default_level())
+
+    def load_level(self, level):
+        """Take over a portal_level.Level: its tile arrays, colliders, lasers, buttons and doors, then reset."""
+        self.level = level
+        info = level.info
+        self.spawn_pos = info['spawn'].tolist()
+        self.spawn_yaw = float(info['spawn_yaw'])
+        self.room_min = info['room_min'].tolist()
+        self.room_max = info['room_max'].tolist()
+        self.player_min = info['player_min'].tolist()
+        self.player_max = info['player_max'].tolist()
+        # Wall tile data, one row per tile
+        tiles = level.tiles
+        self.tile_quads = tiles['quad']  # (n, 4, 3) corners in drawing order
+        self.tile_bounds = np.stack([tiles['min'], tiles['max']], axis=1)  # (n, 2, 3) min and max corners
+        self.tile_aabbs = self.tile_bounds + np.array([-BULLET_RADIUS, BULLET_RADIUS])[:, None]  # Bullet-inflated bounds
+        self.tile_wall = tiles['wall']
+        self.tile_is_door = tiles['door'] >= 0
+        self.tile_colors = ['gray'] * len(tiles)
+        # Lasers, buttons and doors as plain floats for the per-step checks
+        self.lasers = []
+        for laser in level.lasers:
+            axis = int(laser['axis'])
+            hole_min = laser['hole_min'].tolist()
+            hole_max = laser['hole_max'].tolist()
+            self.lasers.append({
+                'axis': axis, 'plane_axes': plane_axes(axis), 'value': float(laser['value']),
+                'guarded': bool(laser['guarded']), 'min': laser['min'].tolist(), 'max': laser['max'].tolist(),
+                'hole': all(hole_min[i] <= hole_max[i] for i in range(3)), 'hole_min': hole_min, 'hole_max': hole_max,
+                'trigger_min': laser['trigger_min'].tolist(), 'trigger_max': laser['trigger_max'].tolist(),
+            })
+        self.buttons = [{'pos': button['pos'].tolist(), 'radius': float(button['radius']), 'height': float(button['height'])}
+                        for button in level.buttons]
+        self.doors = [{'trigger_min': door['trigger_min'].tolist(), 'trigger_max': door['trigger_max'].tolist()}
+                      for door in level.doors]
+        self.build_colliders()
+        self.portals['blue'].clear()
+        self.portals['yellow'].clear()
+        self.changed_tiles.update(range(len(tiles)))
+        self.reset_state()
+        log.info("Loaded level: %d walls, %d tiles, %d lasers, %d buttons, %d doors",
+                 len(level.walls), len(tiles), len(level.lasers), len(level.buttons), len(level.doors))
+
+    def build_colliders(self):
+        """Build the collider sets: solids stop bullets, triggers react to the player.
+
+        Lasers are added before tiles, so a bullet crossing both in one step is
+        stopped by the laser.
+        """
+        level = self.level
+        lasers = level.lasers
+        self.solids = portal_collide.Colliders()
+        self.solids.add_rects(LASER, lasers['axis'], lasers['value'], lasers['min'], lasers['max'],
+                              lasers['hole_min'], lasers['hole_max'])
+        self.solids.add_boxes(TILE, self.tile_aabbs[:, 0], self.tile_aabbs[:, 1])
+        self.solids.build()
+        self.solid_guarded = np.zeros(self.solids.count, dtype=bool)  # Door laser flag per solid
+        self.solid_guarded[:len(lasers)] = lasers['guarded'] != 0
+        self.triggers = portal_collide.Colliders()
+        self.triggers.add_boxes(LASER, lasers['trigger_min'], lasers['trigger_max'])
+        self.triggers.add_boxes(DOOR, level.doors['trigger_min'], level.doors['trigger_max'])
+        buttons = level.buttons
+        self.triggers.add_cylinders(BUTTON, buttons['pos'], buttons['radius'], buttons['height'] + 0.1)
+        self.triggers.build()
+        self._contacts_pos = None  # Player position the cached trigger query was made at
+
+    def player_contacts(self):
+        """Return [(kind, index)] for the triggers containing the player, in collider order.
+
+        The query is cached per player position, so the checks in one step share it.
+        """
+        key = tuple(self.player_pos)
+        if key != self._contacts_pos:
+            hits = self.triggers.point_hits(self.player_pos)
+            self._contacts = list(zip(self.triggers.kind[hits].tolist(), self.triggers.owner[hits].tolist()))
+            self._contacts_pos = key
+        return self._contacts
+
+    def reset_state(self):
+        self.player_pos = list(self.spawn_pos)
+        self.player_yaw = self.spawn_yaw  # Player rotation (left/right)
+        self.player_pitch = 0.0  # Player rotation (up/down)
+        self.bullets.clear()
+        self.blue_shot_fired = False  # Tracks if any blue bullet hit a tile
+        self.yellow_shot_fired = False  # Tracks if any yellow bullet hit a tile
+        self.door_color = 'red'
+        self.button_activated = False  # Tracks if button has been stepped on
+        self.v_y = 0.0  # Vertical velocity
+        self.is_falling = False  # Tracks if player is falling after teleport
+        self.last_teleport_time = -TELEPORT_COOLDOWN
+        self.game_won = False  # Tracks if player has cleared the level
+
+    def set_tile_color(self, index, color):
+        """Set a tile's color, update the portal registry and flag the tile for the renderer."""
+        self.tile_colors[index] = color
+        for tiles in self.portals.values():
+            tiles.pop(index, None)
+        if color in self.portals:
+            self.portals[color][index] = self.make_portal(index)
+        self.changed_tiles.add(index)
+
+    def portal(self, color):
+        """Return the portal entry arrivals through color use, its first tile in tile order, or None."""
+        tiles = self.portals[color]
+        return tiles[min(tiles)] if tiles else None
+
+    def make_portal(self, index):
+        """Precompute a portal entry for a tile: its bounds plus the exit point and yaw for arrivals."""
+        bounds_min, bounds_max = self.tile_bounds[index].tolist()
+        wall = self.level.walls[self.tile_wall[index]]
+        normal = wall['normal'].tolist()
+        # Arrivals step 2 units out of the wall, at floor level of the tile
+        exit_x = (bounds_min[0] + bounds_max[0]) / 2 + normal[0] * 2.0
+        exit_y = bounds_min[1]
+        exit_z = (bounds_min[2] + bounds_max[2]) / 2 + normal[2] * 2.0
+        exit_yaw = None if np.isnan(wall['exit_yaw']) else float(wall['exit_yaw'])  # None keeps the current yaw
+        return {'tile': index, 'min': bounds_min, 'max': bounds_max, 'normal': normal,
+                'exit': [exit_x, exit_y, exit_z], 'exit_yaw': exit_yaw}
+
+    def reset_tile_colors(self):
+        """Turn every tile gray and clear the portal registry."""
+        self.tile_colors[:] = ['gray'] * len(self.tile_colors)
+        self.portals['blue'].clear()
+        self.portals['yellow'].clear()
+        self.changed_tiles.update(range(len(self.tile_colors)))
+
+    def set_door_color(self, color):
+        """Set the door color ('red' or 'green') and flag the door tiles for the renderer."""
+        self.door_color = color
+        self.changed_tiles.update(np.flatnonzero(self.tile_is_door).tolist())
+
+    def fire(self, color):
+        """Shoot a bullet of color ('blue' or 'yellow') along the view, once per portal allowance."""
+        if self.game_won:
+            return
+        if (self.blue_shot_fired if color == 'blue' else self.yellow_shot_fired):
+            return
+        direction = look_direction(self.player_yaw, self.player_pitch)
+        bullet_pos = [
+            self.player_pos[0] + direction[0] * 0.8,
+            self.player_pos[1] + 2.5 + direction[1] * 0.8,
+            self.player_pos[2] + direction[2] * 0.8
+        ]
+        self.bullets.spawn(bullet_pos, direction, color)
+        log.info("Shot %s bullet at %s", color, bullet_pos)
+
+    def move_player(self, forward, strafe):
+        """Move the player forward and right (negative for back/left) relative to the yaw, on the ground plane."""
+        lx = math.sin(math.radians(self.player_yaw))
+        lz = -math.cos(math.radians(self.player_yaw))
+        self.player_pos[0] += lx * forward - lz * strafe
+        self.player_pos[2] += lz * forward + lx * strafe
+        self.boundary_player_position()
+
+    def turn(self, yaw, pitch):
+        """Turn right by yaw and look up by pitch degrees, keeping pitch within +/-89."""
+        self.player_yaw += yaw
+        self.player_pitch = max(-89, min(89, self.player_pitch + pitch))
+
+    def boundary_player_position(self):
+        self.player_pos[0] = max(self.player_min[0], min(self.player_max[0], self.player_pos[0]))
+        self.player_pos[2] = max(self.player_min[2], min(self.player_max[2], self.player_pos[2]))
+
+    def apply_inputs(self, inputs, dt):
+        if inputs.reset:
+            self.reset_game()
+        if self.game_won:
+            return  # Ignore input if game is won
+        if inputs.clear_portals:
+            self.reset_bullets()
+        if inputs.yaw or inputs.pitch:
+            self.turn(inputs.yaw, inputs.pitch)
+        if inputs.forward or inputs.strafe:
+            self.move_player(inputs.forward * PLAYER_SPEED * dt, inputs.strafe * PLAYER_SPEED * dt)
+        if inputs.fire_blue:
+            self.fire('blue')
+        if inputs.fire_yellow:
+            self.fire('yellow')
+
+    def step(self, dt, inputs=None):
+        """Advance the game by dt seconds: apply inputs, move bullets and player, then run collision checks."""
+        if inputs is not None:
+            self.apply_inputs(inputs, dt)
+        profiler = self.profiler
+        with profiler.phase('update_bullets'):
+            self.update_bullets(dt)
+        with profiler.phase('update_player_physics'):
+            self.update_player_physics(dt)
+        self.time += dt
+        if not self.game_won:
+            with profiler.phase('collision'):
+                self.check_player_tile_collision()
+                self.check_door_collision()
+                self.check_button_laser_collision()
+                self.check_button_interaction()
+
+    def update_bullets(self, dt):
+        if self.game_won:
+            return  # Skip bullet updates if game is won
+        bullets = self.bullets
+        n = bullets.count
+        if n == 0:
+            return
+        pos = bullets.pos[:n]
+        color = bullets.color[:n]
+        alive = bullets.alive[:n]
+        bullets.time_alive[:n] += dt
+        alive[:] = bullets.time_alive[:n] < BULLET_LIFETIME
+        old_pos = bullets.prev_pos[:n]
+        old_pos[:] = pos
+        pos += bullets.velocity[:n] * dt
+        # Bullets outside the room keep flying but skip collision checks
+        room_min = self.room_min
+        room_max = self.room_max
+        active = alive & ((pos[:, 0] >= room_min[0]) & (pos[:, 0] <= room_max[0]) &
+                          (pos[:, 2] >= room_min[2]) & (pos[:, 2] <= room_max[2]) &
+                          (pos[:, 1] >= room_min[1]) & (pos[:, 1] <= room_max[1]))
+
+        # Sweep the active segments through the solids; each bullet stops at its first hit in collider order
+        index = np.flatnonzero(active)
+        segment, collider, t = self.solids.segment_hits(old_pos[index], pos[index])
+        if self.button_activated:
+            # Door lasers are off once the button is pressed
+            keep = ~self.solid_guarded[collider]
+            segment, collider, t = segment[keep], collider[keep], t[keep]
+        kind = self.solids.kind[collider]
+        owner = self.solids.owner[collider]
+        first = np.unique(segment, return_index=True)[1]
+        hit_colors = set()
+        for s, k, j, f in zip(segment[first].tolist(), kind[first].tolist(), owner[first].tolist(), t[first].tolist()):
+            i = int(index[s])
+            alive[i] = False
+            if k == LASER:
+                laser = self.lasers[j]
+                log.info("%s bullet hit %s laser wall at %s=%.2f, point=%s", BULLET_COLORS[color[i]],
+                         'door' if laser['guarded'] else 'button', 'XYZ'[laser['axis']], laser['value'],
+                         (old_pos[i] + f * (pos[i] - old_pos[i])).tolist())
+            else:
+                self.set_tile_color(j, BULLET_COLORS[color[i]])
+                hit_colors.add(int(color[i]))
+                log.info("%s bullet hit wall tile at %s", BULLET_COLORS[color[i]], pos[i].tolist())
+
+        if BULLET_BLUE in hit_colors:
+            self.blue_shot_fired = True
+            alive &= color != BULLET_BLUE
+        if BULLET_YELLOW in hit_colors:
+            self.yellow_shot_fired = True
+            alive &= color != BULLET_YELLOW
+        bullets.compact()
+
+    def update_player_physics(self, dt):
+        if self.game_won:
+            return  # Skip physics if game is won
+        if self.is_falling and self.player_pos[1] > 0.0:
+            self.v_y += GRAVITY * dt
+            self.player_pos[1] += self.v_y * dt
+            log.debug("Falling: y=%.2f, v_y=%.2f", self.player_pos[1], self.v_y)
+            if self.player_pos[1] <= 0.0:
+                self.player_pos[1] = 0.0
+                self.v_y = 0.0
+                self.is_falling = False
+                log.debug("Landed on ground: y=0.0, v_y=0.0")
+
+    def check_player_tile_collision(self):
+        if self.game_won:
+            return  # Skip collision checks if game is won
+        if self.time - self.last_teleport_time < TELEPORT_COOLDOWN:
+            return
+        player_pos = self.player_pos
+        # Check the active portals in tile order, matching the order tiles are laid out
+        active = sorted((p for tiles in self.portals.values() for p in tiles.values()), key=lambda p: p['tile'])
+        for portal in active:
+            bounds_min = portal['min']
+            bounds_max = portal['max']
+            if (bounds_min[0] - 0.5 <= player_pos[0] <= bounds_max[0] + 0.5 and
+                bounds_min[1] - 0.5 <= player_pos[1] <= bounds_max[1] + 0.5 and
+                bounds_min[2] - 0.5 <= player_pos[2] <= bounds_max[2] + 0.5):
+                color = self.tile_colors[portal['tile']]
+                dest_color = 'yellow' if color == 'blue' else 'blue'
+                log.info("Player at %s touched %s tile, searching for %s", player_pos, color, dest_color)
+                dest = self.portal(dest_color)
+                if dest is not None:
+                    log.debug("Dest tile: y_min=%.2f, y_max=%.2f, dest_y=%.2f", bounds_min[1], bounds_max[1], dest['exit'][1])
+                    player_pos[:] = dest['exit']
+                    if dest['exit_yaw'] is not None:
+                        self.player_yaw = dest['exit_yaw']
+                    self.v_y = 0.0
+                    self.is_falling = True
+                    self.boundary_player_position()
+                    self.last_teleport_time = self.time
+                    log.info("Teleported to %s tile at %s (y=%.2f), cooldown started", dest_color, player_pos, dest['exit'][1])
+                break
+
+    def reset_game(self):
+        """Reset the game to initial state."""
+        self.reset_state()
+        self.reset_tile_colors()
+        self.set_door_color('red')
+        log.info("Game reset: Player at %s, tiles gray, door red, button off, game_won=False", self.spawn_pos)
+
+    def reset_bullets(self):
+        """Reset bullet allowances and clear portals."""
+        self.bullets.clear()
+        self.blue_shot_fired = False
+        self.yellow_shot_fired = False
+        self.reset_tile_colors()
+        log.info("Bullets and portals reset: blue_shot_fired=False, yellow_shot_fired=False, tiles gray")
+
+    def check_button_laser_collision(self):
+        """Check if player is too close to button laser walls, reset game if so."""
+        if self.game_won:
+            return  # Skip collision checks if game is won
+        player_pos = self.player_pos
+        for kind, index in self.player_contacts():
+            if kind == LASER and not self.lasers[index]['guarded']:
+                laser = self.lasers[index]
+                log.info("Player at %s touched button laser wall at %s=%.2f, resetting game",
+                         player_pos, 'XYZ'[laser['axis']], laser['value'])
+                self.reset_game()
+                return
+
+    def check_door_collision(self):
+        """Check if player touches door laser wall or green door tiles, handle reset or win."""
+        if self.game_won:
+            return  # Skip collision checks if game is won
+        player_pos = self.player_pos
+        # Laser triggers come before door triggers in collider order, so a door laser takes priority
+        for kind, index in self.player_contacts():
+            if kind == LASER and self.lasers[index]['guarded']:
+                laser = self.lasers[index]
+                if not self.button_activated:
+                    log.info("Player at %s touched door laser wall at %s=%.2f, resetting game",
+                             player_pos, 'XYZ'[laser['axis']], laser['value'])
+                    self.reset_game()
+                else:
+                    log.debug("Player at %s passed through the door laser (green door active), no action", player_pos)
+                return
+            if kind == DOOR:
+                if self.button_activated:
+                    self.game_won = True
+                    log.info("Player cleared level at %s: Touched green door tiles, game_won=True", player_pos)
+                else:
+                    log.debug("Player at %s touched door tiles, but door is red", player_pos)
+                return
+        log.debug("Player at %s, not at a door laser or door tiles, button_activated=%s, game_won=%s",
+                  player_pos, self.button_activated, self.game_won)
+
+    def check_button_interaction(self):
+        """Check if player steps on a button and set door color to green permanently."""
+        if self.game_won:
+            return  # Skip button interaction if game is won
+        if self.button_activated:
+            return
+        player_pos = self.player_pos
+        for kind, _ in self.player_contacts():
+            if kind == BUTTON:
+                self.set_door_color('green')
+                self.button_activated = True
+                log.info("Player at %s stepped on button: Door color set to green permanently, game_won=%s", player_pos, self.game_won)
+                return
+        log.debug("Player at %s, button not activated yet, game_won=%s", player_pos, self.game_won)